@@ -0,0 +1,85 @@
+# async_database.py
+# Async variants of the functions in database.py.
+#
+# mysql.connector is blocking, so each call runs on a small thread pool and
+# is awaited from asyncio. Several queries can be in flight at once (see
+# fetch_all_records) and none of them block the Tk thread.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from DB import database
+
+MAX_WORKERS = 4
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="healthhub-db")
+    return _executor
+
+
+async def run_blocking(fn, *args):
+    """Await a blocking database call on the worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(fn, *args))
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+# ---------------- MAIN RECORDS ----------------
+
+async def fetch_main_records():
+    return await run_blocking(database.fetch_main_records)
+
+
+async def insert_main_record(data):
+    return await run_blocking(database.insert_main_record, data)
+
+
+async def update_main_record(record_id, data):
+    return await run_blocking(database.update_main_record, record_id, data)
+
+
+async def delete_main_record(record_id):
+    return await run_blocking(database.delete_main_record, record_id)
+
+
+# ---------------- WELLNESS RECORDS ----------------
+
+async def fetch_wellness_records():
+    return await run_blocking(database.fetch_wellness_records)
+
+
+async def insert_wellness_record(data):
+    return await run_blocking(database.insert_wellness_record, data)
+
+
+async def update_wellness_record(record_id, data):
+    return await run_blocking(database.update_wellness_record, record_id, data)
+
+
+async def delete_wellness_record(record_id):
+    return await run_blocking(database.delete_wellness_record, record_id)
+
+
+# ---------------- DESCRIPTIONS ----------------
+
+async def fetch_description(source, record_id):
+    return await run_blocking(database.fetch_description, source, record_id)
+
+
+# ---------------- COMBINED ----------------
+
+async def fetch_all_records():
+    """Both tables fetched in parallel, merged like main.fetch_all_records()."""
+    main_rows, wellness_rows = await asyncio.gather(fetch_main_records(), fetch_wellness_records())
+    return [("main", r) for r in main_rows] + [("wellness", w) for w in wellness_rows]
@@ -1,7 +1,65 @@
 # mysql_db.py
-import mysql.connector
+import socket
+import time
+import uuid
+
+import profiling
+import schema
+from query_cache import cache
+
+# Fetch results are cached (see query_cache.py) and dropped by the
+# insert/update/delete functions below. Other workstations write to the same
+# tables, so cached rows also expire after CACHE_TTL seconds.
+CACHE_TTL = 30
+
+# Lists only carry the start of each description, enough for
+# schema.preview(); forms read the full text with fetch_description().
+DESCRIPTION_HEAD = f"SUBSTR(description, 1, {schema.PREVIEW_SOURCE_CHARS + 1}) AS description"
+MAIN_LIST_COLUMNS = f"id, label, type, {DESCRIPTION_HEAD}, datetime, severity"
+WELLNESS_LIST_COLUMNS = f"id, label, category, frequency, {DESCRIPTION_HEAD}, datetime"
+
+# Once sync.ensure_schema() has added the sync columns, writes here take
+# part in sync like the sync engine's own pushes: every row gets a uid, a
+# version (time, ORIGIN) and the next sync_version, and deletes leave a
+# tombstone (deleted = 1) that the fetches skip. Without the columns the
+# functions work on the plain tables as before.
+ORIGIN = ("mysql:" + socket.gethostname())[:64]
+SYNC_COLUMNS = ", uid, version_ts, origin, sync_version"
+SYNC_ASSIGNMENTS = "uid=COALESCE(uid, %s), version_ts=%s, origin=%s, sync_version=%s"
+_sync_schema = False
+
+
+def has_sync_columns(cur):
+    """True once the tables have the sync columns (checked until they do)."""
+    global _sync_schema
+    if not _sync_schema:
+        try:
+            cur.execute("SELECT uid FROM main_records LIMIT 0")
+            cur.fetchall()
+            _sync_schema = True
+        except Exception:
+            pass    # not migrated; mysql.connector / sqlite3 errors differ
+    return _sync_schema
+
+
+def sync_stamp(cur, table):
+    """(uid, version_ts, origin, sync_version) for a write to `table`, or () without the sync columns."""
+    if not has_sync_columns(cur):
+        return ()
+    cur.execute(f"SELECT MAX(sync_version) FROM {table} FOR UPDATE")
+    row = cur.fetchone()
+    return uuid.uuid4().hex, time.time(), ORIGIN, ((row[0] if row else None) or 0) + 1
+
+
+def live_rows(cur, where=""):
+    """WHERE clause that also skips tombstones when the sync columns exist."""
+    conditions = [c for c in (where, "deleted = 0" if has_sync_columns(cur) else "") if c]
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
 
 def get_connection():
+    import mysql.connector  # imported on first use to keep startup light
+
     return mysql.connector.connect(
         host="localhost",
         user="root",
@@ -12,99 +70,161 @@ def get_connection():
 
 # ---------------- MAIN RECORDS ----------------
 
+@profiling.timed("mysql.fetch_main_records")
 def fetch_main_records():
+    rows = cache.get(("mysql", "main_records"))
+    if rows is not None:
+        return rows
+
+    generation = cache.generation(("mysql:main_records",))
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM main_records ORDER BY id ASC")
+    cur.execute(f"SELECT {MAIN_LIST_COLUMNS} FROM main_records{live_rows(cur)} ORDER BY id ASC")
     rows = cur.fetchall()
     conn.close()
+    schema.clean_rows("main", rows)
+    cache.put(("mysql", "main_records"), rows, tables=("mysql:main_records",), ttl=CACHE_TTL,
+              generation=generation, owned=True)
     return rows
 
 
+@profiling.timed("mysql.insert_main_record")
 def insert_main_record(data):
+    data = schema.clean_record("main", data)
     conn = get_connection()
     cur = conn.cursor()
-    query = """
-        INSERT INTO main_records (label, type, description, datetime, severity)
-        VALUES (%s, %s, %s, %s, %s)
-    """
-    cur.execute(query, (
+    stamp = sync_stamp(cur, "main_records")
+    values = (
         data["label"], data["type"], data["description"],
         data["datetime"], data["severity"]
-    ))
+    ) + stamp
+    query = f"""
+        INSERT INTO main_records (label, type, description, datetime, severity{SYNC_COLUMNS if stamp else ""})
+        VALUES ({", ".join(["%s"] * len(values))})
+    """
+    cur.execute(query, values)
     conn.commit()
+    cache.invalidate("mysql:main_records")
     conn.close()
 
 
+@profiling.timed("mysql.update_main_record")
 def update_main_record(record_id, data):
+    data = schema.clean_record("main", data)
     conn = get_connection()
     cur = conn.cursor()
-    query = """
+    stamp = sync_stamp(cur, "main_records")
+    query = f"""
         UPDATE main_records
-        SET label=%s, type=%s, description=%s, datetime=%s, severity=%s
+        SET label=%s, type=%s, description=%s, datetime=%s, severity=%s{", " + SYNC_ASSIGNMENTS if stamp else ""}
         WHERE id=%s
     """
     cur.execute(query, (
         data["label"], data["type"], data["description"],
-        data["datetime"], data["severity"], record_id
-    ))
+        data["datetime"], data["severity"]
+    ) + stamp + (record_id,))
     conn.commit()
+    cache.invalidate("mysql:main_records")
     conn.close()
 
 
+@profiling.timed("mysql.delete_main_record")
 def delete_main_record(record_id):
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("DELETE FROM main_records WHERE id=%s", (record_id,))
+    stamp = sync_stamp(cur, "main_records")
+    if stamp:
+        cur.execute(f"UPDATE main_records SET deleted=1, {SYNC_ASSIGNMENTS} WHERE id=%s", stamp + (record_id,))
+    else:
+        cur.execute("DELETE FROM main_records WHERE id=%s", (record_id,))
     conn.commit()
+    cache.invalidate("mysql:main_records")
     conn.close()
 
 
 # ---------------- WELLNESS RECORDS ----------------
 
+@profiling.timed("mysql.fetch_wellness_records")
 def fetch_wellness_records():
+    rows = cache.get(("mysql", "wellness_records"))
+    if rows is not None:
+        return rows
+
+    generation = cache.generation(("mysql:wellness_records",))
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM wellness_records ORDER BY id ASC")
+    cur.execute(f"SELECT {WELLNESS_LIST_COLUMNS} FROM wellness_records{live_rows(cur)} ORDER BY id ASC")
     rows = cur.fetchall()
     conn.close()
+    schema.clean_rows("wellness", rows)
+    cache.put(("mysql", "wellness_records"), rows, tables=("mysql:wellness_records",), ttl=CACHE_TTL,
+              generation=generation, owned=True)
     return rows
 
 
+@profiling.timed("mysql.insert_wellness_record")
 def insert_wellness_record(data):
+    data = schema.clean_record("wellness", data)
     conn = get_connection()
     cur = conn.cursor()
-    query = """
-        INSERT INTO wellness_records (label, category, frequency, description, datetime)
-        VALUES (%s, %s, %s, %s, %s)
-    """
-    cur.execute(query, (
+    stamp = sync_stamp(cur, "wellness_records")
+    values = (
         data["label"], data["category"], data["frequency"],
         data["description"], data["datetime"]
-    ))
+    ) + stamp
+    query = f"""
+        INSERT INTO wellness_records (label, category, frequency, description, datetime{SYNC_COLUMNS if stamp else ""})
+        VALUES ({", ".join(["%s"] * len(values))})
+    """
+    cur.execute(query, values)
     conn.commit()
+    cache.invalidate("mysql:wellness_records")
     conn.close()
 
 
+@profiling.timed("mysql.update_wellness_record")
 def update_wellness_record(record_id, data):
+    data = schema.clean_record("wellness", data)
     conn = get_connection()
     cur = conn.cursor()
-    query = """
+    stamp = sync_stamp(cur, "wellness_records")
+    query = f"""
         UPDATE wellness_records
-        SET label=%s, category=%s, frequency=%s, description=%s, datetime=%s
+        SET label=%s, category=%s, frequency=%s, description=%s, datetime=%s{", " + SYNC_ASSIGNMENTS if stamp else ""}
         WHERE id=%s
     """
     cur.execute(query, (
         data["label"], data["category"], data["frequency"],
-        data["description"], data["datetime"], record_id
-    ))
+        data["description"], data["datetime"]
+    ) + stamp + (record_id,))
     conn.commit()
+    cache.invalidate("mysql:wellness_records")
     conn.close()
 
 
+@profiling.timed("mysql.delete_wellness_record")
 def delete_wellness_record(record_id):
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("DELETE FROM wellness_records WHERE id=%s", (record_id,))
+    stamp = sync_stamp(cur, "wellness_records")
+    if stamp:
+        cur.execute(f"UPDATE wellness_records SET deleted=1, {SYNC_ASSIGNMENTS} WHERE id=%s", stamp + (record_id,))
+    else:
+        cur.execute("DELETE FROM wellness_records WHERE id=%s", (record_id,))
     conn.commit()
+    cache.invalidate("mysql:wellness_records")
+    conn.close()
+
+
+# ---------------- DESCRIPTIONS ----------------
+
+@profiling.timed("mysql.fetch_description")
+def fetch_description(source, record_id):
+    """Full description of one record ("main" or "wellness"), or None if it is gone."""
+    table = "main_records" if source == "main" else "wellness_records"
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(f"SELECT description FROM {table}{live_rows(cur, 'id=%s')}", (record_id,))
+    row = cur.fetchone()
     conn.close()
+    return None if row is None else row[0]
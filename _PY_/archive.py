@@ -0,0 +1,169 @@
+# ==============================
+# RECORD ARCHIVE (COLD STORE)
+# ==============================
+# Records whose date is older than the retention age are moved out of the
+# store files into a compressed, append-only archive. Loading, refreshing
+# and the Dashboard/SavedInfo views only ever see the recent ("hot")
+# records; the archive is only read when the user searches it.
+#
+#   healthhub_archive/
+#       index.json      members (offset, bytes, counts), highest archived ids
+#       records.gz      one gzip member per archive pass, one record per line
+#
+# Each pass appends one gzip member and then rewrites index.json. A member
+# only counts once it is listed in the index, so a pass that was cut short
+# leaves nothing half-visible and the next pass writes over the tail.
+# Callers hold the store lock while archiving (see main.archive_old_records).
+#
+# A record that comes back into the store (restored, or changed through
+# sync) and is archived again is simply appended again; searches keep the
+# last copy and skip records that are in the store. forget() hides the
+# copies archived so far, not the ones appended after it.
+import calendar
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from snapshot import parse_timestamp
+
+DATA = "records.gz"
+INDEX = "index.json"
+
+
+# ======================
+# INDEX
+# ======================
+def read_index(directory):
+    try:
+        with open(os.path.join(directory, INDEX), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"members": [], "max_ids": {"main": 0, "wellness": 0},
+                "counts": {"main": 0, "wellness": 0}, "deleted": []}
+
+
+def write_index(directory, index):
+    tmp = os.path.join(directory, INDEX + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(directory, INDEX))
+
+
+def next_ids(directory):
+    """{"main": id, "wellness": id} one past the highest archived ids."""
+    return {source: n + 1 for source, n in read_index(directory)["max_ids"].items()}
+
+
+# ======================
+# CHOOSING RECORDS
+# ======================
+def cutoff_for(days, now=None):
+    """Epoch seconds (in record time) before which records are archived."""
+    cutoff = (now or datetime.now()) - timedelta(days=days)
+    return calendar.timegm(cutoff.timetuple())
+
+
+def record_time(record):
+    """Record datetime as epoch seconds, or -1 if it has none."""
+    if hasattr(record, "timestamp"):        # snapshot rows: no text decoding
+        return record.timestamp()
+    dt = record.get("datetime")
+    return parse_timestamp(dt) if isinstance(dt, str) else -1
+
+
+def split_old(rows, cutoff):
+    """(recent rows, rows dated before `cutoff`). Undated rows stay recent."""
+    hot, old = [], []
+    for row in rows:
+        ts = record_time(row)
+        (old if ts != -1 and ts < cutoff else hot).append(row)
+    return hot, old
+
+
+# ======================
+# WRITING
+# ======================
+def append(directory, source_rows):
+    """Add {"main": rows, "wellness": rows} to the archive as one member."""
+    os.makedirs(directory, exist_ok=True)
+    index = read_index(directory)
+    lines = [json.dumps({"source": source, "record": dict(row)})
+             for source, rows in source_rows.items() for row in rows]
+    if not lines:
+        return None
+    data = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"), compresslevel=6)
+
+    offset = sum(m["bytes"] for m in index["members"])
+    with open(os.path.join(directory, DATA), "a+b") as f:
+        f.truncate(offset)              # drop the tail of an unfinished pass
+        f.seek(offset)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    member = {"offset": offset, "bytes": len(data), "archived": datetime.now().strftime("%Y-%m-%d %I:%M %p"),
+              "counts": {source: len(rows) for source, rows in source_rows.items()}}
+    index["members"].append(member)
+    for source, rows in source_rows.items():
+        index["counts"][source] += len(rows)
+        if rows:
+            index["max_ids"][source] = max(index["max_ids"][source], max(int(r["id"]) for r in rows))
+    write_index(directory, index)
+    return member
+
+
+def forget(directory, source, record_id):
+    """Hide the archived copies of a record from searches (it was deleted or restored)."""
+    index = read_index(directory)
+    if not index["members"]:
+        return
+    index.setdefault("deleted", []).append([source, record_id, len(index["members"])])
+    write_index(directory, index)
+
+
+# ======================
+# READING
+# ======================
+def iter_records(directory, index=None):
+    """Yield (member number, source, record) for every archived row, one member at a time."""
+    index = index or read_index(directory)
+    if not index["members"]:
+        return
+    with open(os.path.join(directory, DATA), "rb") as f:
+        for number, member in enumerate(index["members"]):
+            f.seek(member["offset"])
+            for line in gzip.decompress(f.read(member["bytes"])).splitlines():
+                entry = json.loads(line)
+                yield number, entry["source"], entry["record"]
+
+
+def search(directory, text="", source=None, main_type=None, exclude=()):
+    """Archived (source, record) pairs matching a search, sorted like fetch_all_records().
+
+    `text` is matched case-insensitively against label and description,
+    `source` is "main" or "wellness" and `main_type` a main record type.
+    Records whose (source, id) is in `exclude` (the store) are skipped.
+    """
+    index = read_index(directory)
+    # (source, id) -> members hidden by forget(); entries written before it
+    # recorded a member count hide every copy.
+    hidden = {}
+    for d in index.get("deleted", []):
+        key = (d[0], d[1])
+        hidden[key] = max(hidden.get(key, 0), d[2] if len(d) > 2 else float("inf"))
+    text = text.strip().lower()
+    found = {}
+    for number, src, rec in iter_records(directory, index):
+        if source is not None and src != source:
+            continue
+        key = (src, rec["id"])
+        if (number >= hidden.get(key, 0)
+                and (main_type is None or rec.get("type") == main_type)
+                and (not text or text in f"{rec.get('label', '')}\n{rec.get('description', '')}".lower())):
+            found[key] = rec
+        else:
+            found.pop(key, None)        # the last copy of a record decides
+
+    keys = sorted(set(found) - set(exclude), key=lambda k: (0 if k[0] == "main" else 1, k[1]))
+    return [(src, found[(src, record_id)]) for src, record_id in keys]
@@ -0,0 +1,72 @@
+# ==========================
+# ASYNCIO <-> TKINTER BRIDGE
+# ==========================
+# Tk must only be touched from its own thread, and its mainloop cannot be
+# shared with asyncio's. The bridge runs an asyncio loop in a daemon thread;
+# finished coroutines are queued and their callbacks are run from a Tk
+# `after` poll, back on the Tk thread.
+import asyncio
+import queue
+import sys
+import threading
+import tkinter as tk
+
+
+class AsyncBridge:
+    POLL_MS = 15
+
+    def __init__(self, root):
+        self.root = root
+        self.loop = asyncio.new_event_loop()
+        self._done = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run_loop, name="healthhub-asyncio", daemon=True)
+        self._thread.start()
+        self._after_id = self.root.after(self.POLL_MS, self._poll)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, on_done=None, on_error=None, widget=None):
+        """Schedule `coro` on the asyncio loop.
+
+        on_done(result) or on_error(exception) is called on the Tk thread.
+        When `widget` is given and has been destroyed by then, both are
+        skipped (e.g. the user left the screen before the query finished).
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(lambda f: self._done.put((f, on_done, on_error, widget)))
+        return future
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    future, on_done, on_error, widget = self._done.get_nowait()
+                except queue.Empty:
+                    break
+
+                if future.cancelled() or (widget is not None and not widget.winfo_exists()):
+                    continue
+
+                # A failing callback is reported like any Tk callback error;
+                # it must not stop the results that come after it.
+                try:
+                    error = future.exception()
+                    if error is not None:
+                        if on_error:
+                            on_error(error)
+                    elif on_done:
+                        on_done(future.result())
+                except Exception:
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            self._after_id = self.root.after(self.POLL_MS, self._poll)
+
+    def close(self):
+        try:
+            self.root.after_cancel(self._after_id)
+        except tk.TclError:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=1)
@@ -0,0 +1,363 @@
+# ==============================
+# INCREMENTAL BACKUPS
+# ==============================
+# A backup chain is one "base" (the store files as they were at one moment)
+# followed by "changes" segments: every insert/update/delete the data layer
+# reported afterwards, as compressed JSON lines. Restoring to a point in time
+# loads the newest base before it and replays the changes up to it.
+#
+#   healthhub_backups/
+#       manifest.json                   file list with times and sha256 sums
+#       base-<time>-<pid>.gz|.zst       store files + id counters
+#       changes-<time>-<pid>.gz|.zst    one change per line
+#
+# Changes are only collected on the Tk thread; compressing and writing
+# happens on a background thread at most once per tick, so backups never
+# stall the UI. Files are compressed with zstd when the `zstandard` package
+# is installed and with gzip otherwise.
+#
+# Replay is idempotent: a record is only overwritten by a change with an
+# equal or higher version, and deleted ids (never reused) stay deleted. So
+# changes from several windows may be replayed in any order, and changes
+# that were already saved when a base was taken are simply applied again.
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import locking
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BASE_EVERY = 5000          # changes per chain before a new base is taken
+BASE_MAX_AGE = 24 * 3600   # ...or seconds since the last base
+MANIFEST = "manifest.json"
+
+
+# ======================
+# COMPRESSION
+# ======================
+def extension():
+    return ".zst" if zstandard is not None else ".gz"
+
+
+def compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(name, data):
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{name} needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=1 << 34)
+    return gzip.decompress(data)
+
+
+# ======================
+# MANIFEST
+# ======================
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"files": []}
+
+
+def add_file(directory, kind, payload, start, end, count):
+    """Compress `payload`, write it to a new file and list it in the manifest."""
+    data = compress(payload)
+    name = f"{kind}-{int(start * 1000)}-{os.getpid()}{extension()}"
+    path = os.path.join(directory, name)
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+    entry = {"name": name, "kind": kind, "start": start, "end": end, "count": count,
+             "bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+    # Other windows may share the backup folder.
+    with locking.lock_for(os.path.join(directory, MANIFEST + ".lock")):
+        manifest = read_manifest(directory)
+        manifest["files"].append(entry)
+        tmp = os.path.join(directory, MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(directory, MANIFEST))
+    return entry
+
+
+def read_file(directory, entry):
+    with open(os.path.join(directory, entry["name"]), "rb") as f:
+        return decompress(entry["name"], f.read())
+
+
+# ======================
+# TAKING BACKUPS
+# ======================
+class BackupManager:
+    """Collects changes from the data layer and writes them in the background.
+
+    `read_store()` returns the current store files for a base, see
+    main.read_store_files().
+    """
+
+    def __init__(self, directory, read_store, base_every=BASE_EVERY, base_max_age=BASE_MAX_AGE):
+        self.directory = directory
+        self.read_store = read_store
+        self.base_every = base_every
+        self.base_max_age = base_max_age
+        os.makedirs(directory, exist_ok=True)
+
+        self.pending = []
+        self._lock = threading.Lock()
+        self._worker = None
+        self.last_error = None
+
+        bases = [e for e in read_manifest(directory)["files"] if e["kind"] == "base"]
+        self.base_time = max((e["start"] for e in bases), default=None)
+        self.changes_since_base = 0
+        self.force_base = self.base_time is None
+
+    def record_change(self, source, op, record):
+        """Change listener for the local data layer (insert/update/delete)."""
+        entry = {"t": time.time(), "source": source, "op": op, "record": dict(record)}
+        with self._lock:
+            self.pending.append(entry)
+
+    def request_base(self):
+        """Start a new chain at the next tick (e.g. after a restore)."""
+        self.force_base = True
+
+    def busy(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def tick(self):
+        """Write what has been collected, in the background. Call periodically."""
+        if self.busy():
+            return False
+        if not self.pending and not self.force_base:
+            return False
+        self._worker = threading.Thread(target=self._write, name="healthhub-backup", daemon=True)
+        self._worker.start()
+        return True
+
+    def close(self):
+        """Finish the running write and flush what is left (on exit)."""
+        if self._worker is not None:
+            self._worker.join()
+        if self.pending:
+            self._write()
+
+    def _write(self):
+        with self._lock:
+            batch, self.pending = self.pending, []
+        try:
+            if batch:
+                payload = "".join(json.dumps(e) + "\n" for e in batch).encode("utf-8")
+                add_file(self.directory, "changes", payload, batch[0]["t"], batch[-1]["t"], len(batch))
+                self.changes_since_base += len(batch)
+        except (OSError, locking.LockTimeout) as e:
+            with self._lock:
+                self.pending[:0] = batch        # retried at the next tick
+            self.last_error = e
+            return
+
+        try:
+            if self._base_due():
+                self._write_base()
+        except (OSError, locking.LockTimeout) as e:
+            self.last_error = e                 # the base is retried at the next tick
+            return
+        self.last_error = None
+
+    def _base_due(self):
+        if self.force_base or self.base_time is None:
+            return True
+        return (self.changes_since_base >= self.base_every
+                or time.time() - self.base_time >= self.base_max_age)
+
+    def _write_base(self):
+        started = time.time()
+        store = self.read_store()
+        header = {"time": started, "ids": store["ids"], "files": {}}
+        blobs = []
+        for source in ("main", "wellness"):
+            fmt, data = store[source]
+            header["files"][source] = {"format": fmt, "bytes": None if data is None else len(data)}
+            if data is not None:
+                blobs.append(data)
+
+        payload = json.dumps(header).encode("utf-8") + b"\n" + b"".join(blobs)
+        add_file(self.directory, "base", payload, started, started, 1)
+        self.base_time = started
+        self.changes_since_base = 0
+        self.force_base = False
+
+
+# ======================
+# RESTORING
+# ======================
+def _decode_rows(fmt, data):
+    if data is None:
+        return []
+    if fmt == "json":
+        return json.loads(data)
+
+    import snapshot
+
+    fd, path = tempfile.mkstemp(suffix=".hhs")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        reader = snapshot.SnapshotReader(path)
+        try:
+            return [dict(r) for r in reader.records()]
+        finally:
+            reader.close()
+    finally:
+        os.remove(path)
+
+
+def load_base(directory, entry):
+    """(rows by source, id counters) stored in a base file."""
+    payload = read_file(directory, entry)
+    newline = payload.index(b"\n")
+    header = json.loads(payload[:newline])
+
+    rows, offset = {}, newline + 1
+    for source in ("main", "wellness"):
+        info = header["files"][source]
+        data = None
+        if info["bytes"] is not None:
+            data = payload[offset:offset + info["bytes"]]
+            offset += info["bytes"]
+        rows[source] = _decode_rows(info["format"], data)
+    return rows, header["ids"]
+
+
+def restore_rows(directory, when=None):
+    """The store as it was at `when` (epoch seconds; None = latest backup).
+
+    Returns ({"main": rows, "wellness": rows}, {"main": next id, ...}).
+    """
+    files = read_manifest(directory)["files"]
+    when = time.time() if when is None else when
+    bases = [e for e in files if e["kind"] == "base" and e["start"] <= when]
+    if not bases:
+        raise LookupError("There is no backup from that time or earlier.")
+    base = max(bases, key=lambda e: e["start"])
+
+    rows, ids = load_base(directory, base)
+    by_id = {source: {r["id"]: r for r in rows[source]} for source in rows}
+    deleted = {"main": set(), "wellness": set()}
+
+    # Only segments that overlap (base time, when] need to be read.
+    segments = sorted((e for e in files if e["kind"] == "changes"
+                       and e["end"] >= base["start"] and e["start"] <= when),
+                      key=lambda e: e["start"])
+    for entry in segments:
+        for line in read_file(directory, entry).splitlines():
+            change = json.loads(line)
+            if not base["start"] <= change["t"] <= when:
+                continue
+            _replay(change, by_id[change["source"]], deleted[change["source"]], ids)
+
+    restored = {source: sorted(by_id[source].values(), key=lambda r: r["id"]) for source in by_id}
+    return restored, ids
+
+
+def _replay(change, rows, deleted, ids):
+    record = change["record"]
+    record_id = record["id"]
+    if change["op"] == "delete":
+        rows.pop(record_id, None)
+        deleted.add(record_id)
+        return
+    if record_id in deleted:
+        return
+
+    current = rows.get(record_id)
+    if current is None or record.get("version", 0) >= current.get("version", 0):
+        rows[record_id] = record
+    ids[change["source"]] = max(ids.get(change["source"], 1), record_id + 1)
+
+
+def restore_points(directory):
+    """(earliest, latest) time that can be restored, or None without backups."""
+    files = read_manifest(directory)["files"]
+    bases = [e["start"] for e in files if e["kind"] == "base"]
+    if not bases:
+        return None
+    return min(bases), max([e["end"] for e in files] + bases)
+
+
+# ======================
+# VERIFYING
+# ======================
+def verify(directory):
+    """Check every file in the manifest. Returns a list of (name, problem)."""
+    problems = []
+    listed = set()
+    for entry in read_manifest(directory)["files"]:
+        name = entry["name"]
+        listed.add(name)
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            problems.append((name, f"cannot read: {e}"))
+            continue
+
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            problems.append((name, "checksum mismatch"))
+            continue
+        try:
+            payload = decompress(name, data)
+            if entry["kind"] == "changes":
+                count = sum(1 for line in payload.splitlines() if json.loads(line))
+                if count != entry["count"]:
+                    problems.append((name, f"{count} changes, manifest says {entry['count']}"))
+            else:
+                json.loads(payload[:payload.index(b"\n")])
+        except Exception as e:
+            problems.append((name, f"cannot decode: {e}"))
+
+    for name in sorted(os.listdir(directory)):
+        if name.startswith(("base-", "changes-")) and not name.endswith(".tmp") and name not in listed:
+            problems.append((name, "not listed in the manifest"))
+    return problems
+
+
+if __name__ == "__main__":
+    # python backup.py verify  healthhub_backups
+    # python backup.py restore healthhub_backups "2025-12-11 10:00 AM" OUT_DIR
+    if len(sys.argv) == 3 and sys.argv[1] == "verify":
+        found = verify(sys.argv[2])
+        for name, problem in found:
+            print(f"{name}: {problem}")
+        print("OK" if not found else f"{len(found)} problem(s)")
+        sys.exit(1 if found else 0)
+    elif len(sys.argv) == 5 and sys.argv[1] == "restore":
+        from schema import parse_datetime
+
+        point = parse_datetime(sys.argv[3])
+        if point is None:
+            sys.exit("time must look like 2025-12-11 10:00 AM")
+        restored, _ids = restore_rows(sys.argv[2], time.mktime(point.timetuple()))
+        os.makedirs(sys.argv[4], exist_ok=True)
+        for source, filename in (("main", "healthhub_records.json"), ("wellness", "healthhub_wellness.json")):
+            with open(os.path.join(sys.argv[4], filename), "w") as f:
+                json.dump(restored[source], f, indent=4)
+    else:
+        sys.exit('usage: backup.py verify DIR | restore DIR "YYYY-MM-DD HH:MM AM" OUT_DIR')
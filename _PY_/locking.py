@@ -0,0 +1,138 @@
+# ==============================
+# MULTI-PROCESS STORE LOCKING
+# ==============================
+# Several HealthHub windows (processes) may share one set of data files.
+# Writers take an advisory lock on a separate lock file (fcntl.flock on
+# POSIX, msvcrt.locking on Windows), re-read whatever another process
+# changed, apply their change and save, all before releasing the lock.
+#
+# The lock is re-entrant within a process, so a data-layer function that
+# calls save_all_data() while holding it does not deadlock.
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_TIMEOUT = 10.0
+RETRY_DELAY = 0.01
+
+
+class LockTimeout(RuntimeError):
+    pass
+
+
+class VersionConflict(RuntimeError):
+    """An update was based on an older version of the record."""
+
+    def __init__(self, source, record_id, expected, actual):
+        if actual is None:
+            message = "This record was deleted in another HealthHub window."
+        else:
+            message = (f"This record was changed in another HealthHub window "
+                       f"(version {actual}, you edited version {expected}). Reopen it and try again.")
+        super().__init__(message)
+        self.source = source
+        self.record_id = record_id
+        self.expected = expected
+        self.actual = actual
+
+
+class FileLock:
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def try_acquire(self):
+        """acquire() without waiting: False if another process holds the lock."""
+        timeout, self.timeout = self.timeout, 0
+        try:
+            self.acquire()
+        except LockTimeout:
+            return False
+        finally:
+            self.timeout = timeout
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def _lock_file(self):
+        f = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    f.close()
+                    raise LockTimeout(f"Timed out waiting for {self.path}")
+                time.sleep(RETRY_DELAY)
+        self._file = f
+
+    def _unlock_file(self):
+        f, self._file = self._file, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+
+_locks = {}
+
+
+def lock_for(path):
+    """The process-wide FileLock for `path`."""
+    path = os.path.abspath(path)
+    if path not in _locks:
+        _locks[path] = FileLock(path)
+    return _locks[path]
+
+
+def file_signature(path):
+    """(mtime, size, inode) of a file, or None if it does not exist.
+
+    Files are replaced atomically on save, so the inode changes even when
+    two writes land within the file system's mtime resolution.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
@@ -1,120 +1,55 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
 import json
 import os
-import mysql.connector
+from contextlib import contextmanager
+
+import locking
+import profiling
+import schema
+from query_cache import cache, make_key
 
 # ====================
-# DATABASE CONNECTION
+# DATABASE BACKEND
 # ====================
-def get_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="healthhub"
-    )
-
-
-# ---------------- MAIN RECORDS ----------------
-
-def fetch_main_records():
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM main_records ORDER BY id ASC")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
-
-
-def insert_main_record(data):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = """
-        INSERT INTO main_records (label, type, description, datetime, severity)
-        VALUES (%s, %s, %s, %s, %s)
-    """
-    cur.execute(query, (
-        data["label"], data["type"], data["description"],
-        data["datetime"], data["severity"]
-    ))
-    conn.commit()
-    conn.close()
-
-
-def update_main_record(record_id, data):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = """
-        UPDATE main_records
-        SET label=%s, type=%s, description=%s, datetime=%s, severity=%s
-        WHERE id=%s
-    """
-    cur.execute(query, (
-        data["label"], data["type"], data["description"],
-        data["datetime"], data["severity"], record_id
-    ))
-    conn.commit()
-    conn.close()
-
-
-def delete_main_record(record_id):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM main_records WHERE id=%s", (record_id,))
-    conn.commit()
-    conn.close()
-
-
-# ---------------- WELLNESS RECORDS ----------------
-
-def fetch_wellness_records():
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM wellness_records ORDER BY id ASC")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
-
-
-def insert_wellness_record(data):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = """
-        INSERT INTO wellness_records (label, category, frequency, description, datetime)
-        VALUES (%s, %s, %s, %s, %s)
-    """
-    cur.execute(query, (
-        data["label"], data["category"], data["frequency"],
-        data["description"], data["datetime"]
-    ))
-    conn.commit()
-    conn.close()
-
-
-def update_wellness_record(record_id, data):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = """
-        UPDATE wellness_records
-        SET label=%s, category=%s, frequency=%s, description=%s, datetime=%s
-        WHERE id=%s
-    """
-    cur.execute(query, (
-        data["label"], data["category"], data["frequency"],
-        data["description"], data["datetime"], record_id
-    ))
-    conn.commit()
-    conn.close()
-
-
-def delete_wellness_record(record_id):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM wellness_records WHERE id=%s", (record_id,))
-    conn.commit()
-    conn.close()
+# "json" (default) keeps everything in the local JSON files. "mysql" uses the
+# functions in DB/database.py through their async variants in
+# DB/async_database.py, so queries never block the Tk thread. "sync" works on
+# the local files and syncs them with MySQL in the background (sync.py). The
+# driver is only imported when one of those backends is configured.
+BACKEND = os.environ.get("HEALTHHUB_BACKEND", "json").strip().lower()
+
+_mysql_db = None
+_async_mysql_db = None
+
+
+def mysql_db():
+    """Return the DB.database module, importing it on first use."""
+    global _mysql_db
+    if _mysql_db is None:
+        from DB import database
+        _mysql_db = database
+    return _mysql_db
+
+
+def async_mysql_db():
+    """Return the DB.async_database module, importing it on first use."""
+    global _async_mysql_db
+    if _async_mysql_db is None:
+        from DB import async_database
+        _async_mysql_db = async_database
+    return _async_mysql_db
+
+
+def is_connection_error(error):
+    """True if `error` only means MySQL cannot be reached right now."""
+    if isinstance(error, OSError):
+        return True
+    try:
+        from mysql.connector import errors
+    except ImportError:
+        return False
+    return isinstance(error, (errors.InterfaceError, errors.OperationalError))
 
 
 # ================
@@ -127,6 +62,8 @@ selected_source = None
 quick_type = None
 next_id = 1
 next_wellness_id = 1
+remote_rows = {}           # (source, id) -> row last fetched from MySQL
+change_listeners = []      # fn(source, op, record) called after each local change
 
 # =============
 # COLOR THEME
@@ -147,84 +84,617 @@ TREE_FG = "#E0E0E0"
 MAIN_FILE = "healthhub_records.json"
 WELLNESS_FILE = "healthhub_wellness.json"
 
+# "json" (default) or "snapshot" for the memory-mapped binary format
+# (see snapshot.py). Existing JSON files are picked up and converted on
+# the first save.
+STORE_FORMAT = os.environ.get("HEALTHHUB_STORE_FORMAT", "json").strip().lower()
+MAIN_SNAPSHOT = "healthhub_records.hhs"
+WELLNESS_SNAPSHOT = "healthhub_wellness.hhs"
+SYNC_STATE_FILE = "healthhub_sync.json"
+SYNC_LOCK_FILE = SYNC_STATE_FILE + ".lock"     # held by the one window that syncs
+SYNC_QUEUE_FILE = SYNC_STATE_FILE + ".queue"   # changes other windows hand to it
+SYNC_INTERVAL_MS = 15000
+
+# Incremental backups of the local store (see backup.py); set
+# HEALTHHUB_BACKUPS=0 to turn them off.
+BACKUPS_ENABLED = os.environ.get("HEALTHHUB_BACKUPS", "1").strip() != "0"
+BACKUP_DIR = "healthhub_backups"
+BACKUP_INTERVAL_MS = 30000
+
+# With HEALTHHUB_ARCHIVE_DAYS set, main records dated more than that many
+# days ago are moved to a compressed archive at startup (see archive.py) and
+# only read when the archive is searched; they can be restored from the
+# Archive screen. Off (0) unless set. Wellness habits are never archived:
+# their date is when an ongoing habit started.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("HEALTHHUB_ARCHIVE_DAYS", "0"))
+ARCHIVE_DIR = "healthhub_archive"
+
+# Several HealthHub windows may share these files (see locking.py). Every
+# change is made under LOCK_FILE, after re-reading what others saved. The
+# next free ids live in ID_FILE so a deleted id is never handed out again.
+LOCK_FILE = "healthhub.lock"
+ID_FILE = "healthhub_ids.json"
+WATCH_INTERVAL_MS = 1000
+disk_signatures = {}       # path -> locking.file_signature() at our last load/save
+
+
+def store_lock():
+    return locking.lock_for(LOCK_FILE)
+
+
+def store_paths():
+    """The (main, wellness) files of the configured store format."""
+    if STORE_FORMAT == "snapshot":
+        return MAIN_SNAPSHOT, WELLNESS_SNAPSHOT
+    return MAIN_FILE, WELLNESS_FILE
+
+
+def remember_signatures():
+    for path in store_paths():
+        disk_signatures[path] = locking.file_signature(path)
+
+
+def store_changed():
+    """True if another process saved since our last load/save (no lock needed)."""
+    return any(locking.file_signature(path) != disk_signatures.get(path) for path in store_paths())
+
+
+@contextmanager
+def store_transaction():
+    """Hold the store lock with the in-memory lists up to date with the files."""
+    with store_lock():
+        refresh_from_disk()
+        yield
 
+
+@profiling.timed("save_all_data")
 def save_all_data():
-    """Automatically save all records to JSON."""
-    with open(MAIN_FILE, "w") as f:
-        json.dump(records, f, indent=4)
+    """Automatically save all records to disk."""
+    with store_lock():
+        if STORE_FORMAT == "snapshot":
+            save_snapshots()
+        else:
+            with profiling.span("json.dump:main"):
+                write_json(MAIN_FILE, records)
+            with profiling.span("json.dump:wellness"):
+                write_json(WELLNESS_FILE, wellness_records)
+        write_json(ID_FILE, {"main": next_id, "wellness": next_wellness_id})
+        remember_signatures()
+
+
+def write_json(path, data):
+    """Replace `path` atomically, so readers never see a half-written file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp, path)
 
-    with open(WELLNESS_FILE, "w") as f:
-        json.dump(wellness_records, f, indent=4)
 
+def save_snapshots():
+    """Write both snapshot files and remap them, dropping edited copies."""
+    global records, wellness_records
+    import snapshot
 
+    with profiling.span("snapshot.write:main"):
+        snapshot.write_snapshot(MAIN_SNAPSHOT, records, "main")
+        records = snapshot.load_records(MAIN_SNAPSHOT)
+        cache.invalidate("main")
+
+    with profiling.span("snapshot.write:wellness"):
+        snapshot.write_snapshot(WELLNESS_SNAPSHOT, wellness_records, "wellness")
+        wellness_records = snapshot.load_records(WELLNESS_SNAPSHOT)
+        cache.invalidate("wellness")
+
+
+@profiling.timed("load_all_data")
 def load_all_data():
     """Load all data automatically when program starts."""
+    global records, wellness_records
+
+    with store_lock():
+        main_rows, cleaned_main = read_rows("main")
+        wellness_rows, cleaned_wellness = read_rows("wellness")
+        if main_rows is not None:
+            records = main_rows
+        if wellness_rows is not None:
+            wellness_records = wellness_rows
+
+        cache.clear()
+        load_ids()
+        if cleaned_main or cleaned_wellness:
+            save_all_data()     # write the cleaned rows back once
+        remember_signatures()
+
+
+def read_rows(source):
+    """(rows, how many the cleanup pass fixed) for one list, or (None, 0) without a file.
+
+    Snapshots are only ever written from cleaned rows; JSON files may hold
+    older, hand-edited data and get the cleanup pass.
+    """
+    json_path, snapshot_path = ((MAIN_FILE, MAIN_SNAPSHOT) if source == "main"
+                                else (WELLNESS_FILE, WELLNESS_SNAPSHOT))
+
+    if STORE_FORMAT == "snapshot" and os.path.exists(snapshot_path):
+        import snapshot
+        with profiling.span(f"snapshot.load:{source}"):
+            return snapshot.load_records(snapshot_path), 0
+
+    if not os.path.exists(json_path):
+        return None, 0
+    with profiling.span(f"json.load:{source}"), open(json_path, "r") as f:
+        rows = json.load(f)
+    with profiling.span(f"schema.clean:{source}"):
+        return rows, schema.clean_rows(source, rows)
+
+
+def load_ids():
+    """Fix ID counters: never below the highest id seen, ID_FILE or the archive."""
+    global next_id, next_wellness_id
+    import archive
+
+    try:
+        with open(ID_FILE, "r") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    archived = archive.next_ids(ARCHIVE_DIR)
+
+    next_id = max(next_id, next_free_id(records), stored.get("main", 1), archived["main"])
+    next_wellness_id = max(next_wellness_id, next_free_id(wellness_records),
+                           stored.get("wellness", 1), archived["wellness"])
+
+
+@profiling.timed()
+def refresh_from_disk():
+    """Reload the lists another process saved since our last load/save.
+
+    Unchanged records (same id and version) keep their objects, so only the
+    changed ones are replaced. Returns the sources that changed. Call with
+    the store lock held.
+    """
+    global records, wellness_records
+    if not store_changed():
+        return []
+
+    changed = []
+    for source, path in zip(("main", "wellness"), store_paths()):
+        if locking.file_signature(path) == disk_signatures.get(path):
+            continue
+        rows, _ = read_rows(source)
+        if rows is None:
+            continue
+
+        if source == "main":
+            records, n = merge_reloaded(records, rows)
+        else:
+            wellness_records, n = merge_reloaded(wellness_records, rows)
+        if n:
+            cache.invalidate(source)
+            changed.append(source)
+
+    load_ids()
+    remember_signatures()
+    return changed
+
+
+def read_store_files():
+    """The raw store files and id counters, read under the store lock (for backup.py)."""
+    store = {}
+    with store_lock():
+        for source, json_path, snapshot_path in (("main", MAIN_FILE, MAIN_SNAPSHOT),
+                                                 ("wellness", WELLNESS_FILE, WELLNESS_SNAPSHOT)):
+            store[source] = ("json", None)
+            candidates = [("json", json_path)]
+            if STORE_FORMAT == "snapshot":
+                candidates.insert(0, ("snapshot", snapshot_path))
+            for fmt, path in candidates:
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        store[source] = (fmt, f.read())
+                    break
+
+        try:
+            with open(ID_FILE, "r") as f:
+                store["ids"] = json.load(f)
+        except (OSError, ValueError):
+            store["ids"] = {"main": next_id, "wellness": next_wellness_id}
+    return store
+
+
+def apply_restored(restored, ids):
+    """Replace both lists with rows restored from a backup (backup.restore_rows()).
+
+    Id counters never go down, so ids handed out after the backup are not
+    reused. Every record the restore changes is reported to the change
+    listeners, with a version above both copies, and records the backup
+    did not have are reported as deleted. So sync pushes the restored state
+    to MySQL instead of keeping the newer rows there.
+    """
     global records, wellness_records, next_id, next_wellness_id
+    with store_transaction():
+        changes = restored_changes("main", records, restored["main"])
+        changes += restored_changes("wellness", wellness_records, restored["wellness"])
+        records = restored["main"]
+        wellness_records = restored["wellness"]
+        next_id = max(next_id, ids.get("main", 1), next_free_id(records))
+        next_wellness_id = max(next_wellness_id, ids.get("wellness", 1), next_free_id(wellness_records))
+        cache.clear()
+        save_all_data()
+    for change in changes:
+        notify_change(*change)
+
+
+def restored_changes(source, current, restored):
+    """(source, op, record) for each record a restore changes; bumps their versions."""
+    known = {r["id"]: r for r in current}
+    changes = []
+    for rec in restored:
+        mine = known.pop(rec["id"], None)
+        if mine is not None and dict(mine) == rec:
+            continue
+        mine_version = 0 if mine is None else mine.get("version", 0)
+        rec["version"] = max(rec.get("version", 0), mine_version) + 1
+        changes.append((source, "insert" if mine is None else "update", rec))
+    changes += [(source, "delete", {"id": record_id}) for record_id in known]
+    return changes
+
+
+@profiling.timed()
+def archive_old_records(days=None):
+    """Move main records dated more than `days` (ARCHIVE_AFTER_DAYS) ago to the archive.
+
+    Returns how many were moved. Archiving is not a delete: change listeners
+    (sync, backups) are not told, so the records stay in MySQL and backups.
+    """
+    global records
+    import archive
+
+    cutoff = archive.cutoff_for(ARCHIVE_AFTER_DAYS if days is None else days)
+    with store_transaction():
+        hot, old = archive.split_old(records, cutoff)
+        if not old:
+            return 0
+
+        # Archive first: if saving the store fails, the records are in both
+        # places and archive searches skip the ones still in the store.
+        archive.append(ARCHIVE_DIR, {"main": old})
+        records = hot
+        cache.invalidate("main")
+        save_all_data()
+    return len(old)
+
+
+def restore_archived(source, record):
+    """Put an archived record back into the store under its own id.
+
+    Returns False if a record with that id is already there. Like
+    archiving, this is a move: change listeners are not told.
+    """
+    import archive
+
+    with store_transaction():
+        rows = records if source == "main" else wellness_records
+        if any(r["id"] == record["id"] for r in rows):
+            return False
+        rows.append(dict(record))
+        cache.invalidate(source)
+        save_all_data()
+    # Hide the archived copy, so deleting the record later does not bring it back.
+    archive.forget(ARCHIVE_DIR, source, record["id"])
+    return True
+
+
+@profiling.timed()
+def search_archive(text="", kind=None, exclude=()):
+    """Archived (source, row) pairs; kind is a main type, "Wellness" or None for all.
+
+    Reads the whole archive, so call it off the Tk thread.
+    """
+    import archive
 
-    if os.path.exists(MAIN_FILE):
-        with open(MAIN_FILE, "r") as f:
-            records = json.load(f)
+    if kind == "Wellness":
+        return archive.search(ARCHIVE_DIR, text, source="wellness", exclude=exclude)
+    if kind is not None:
+        return archive.search(ARCHIVE_DIR, text, source="main", main_type=kind, exclude=exclude)
+    return archive.search(ARCHIVE_DIR, text, exclude=exclude)
 
-    if os.path.exists(WELLNESS_FILE):
-        with open(WELLNESS_FILE, "r") as f:
-            wellness_records = json.load(f)
 
-    # Fix ID counters
-    next_id = (max([int(r["id"]) for r in records]) + 1) if records else 1
-    next_wellness_id = (max([int(r["id"]) for r in wellness_records]) + 1) if wellness_records else 1
+def store_keys():
+    """(source, id) of every record in the store, for search_archive(exclude=...)."""
+    return ({("main", r["id"]) for r in records}
+            | {("wellness", r["id"]) for r in wellness_records})
+
+
+def merge_reloaded(current, reloaded):
+    """(rows, number of changed records) after a reload of one list."""
+    if hasattr(reloaded, "max_id"):
+        # A remapped snapshot decodes rows only when touched anyway.
+        return reloaded, len(reloaded) or len(current)
+
+    known = {r["id"]: r for r in current}
+    merged, changed = [], 0
+    for row in reloaded:
+        mine = known.pop(row["id"], None)
+        if mine is not None and mine.get("version", 0) == row.get("version", 0):
+            merged.append(mine)
+        else:
+            merged.append(row)
+            changed += 1
+    return merged, changed + len(known)
+
+
+def next_free_id(rows):
+    """One past the highest id (snapshot files keep it in their header)."""
+    if not rows:
+        return 1
+    if hasattr(rows, "max_id"):
+        return rows.max_id + 1
+    return max([int(r["id"]) for r in rows]) + 1
 
 
 # =========================================
 # DATABASE-LIKE FUNCTIONS (WITH AUTO-SAVE)
 # =========================================
+# Query results come from the read-through cache in query_cache.py. Every
+# change to a list below goes through notify_change() or
+# apply_synced_change(), which drop the cached results for that list.
+# Cached lists are shared between callers and must not be modified.
+@profiling.timed()
 def fetch_all_records():
+    return cache.get_or_load(("all_records",), merge_records, tables=("main", "wellness"))
+
+
+def merge_records():
     merged = [("main", r) for r in records] + [("wellness", w) for w in wellness_records]
     merged.sort(key=lambda x: (0 if x[0] == "main" else 1, x[1]["id"]))
     return merged
 
 
-def insert_record(data):
-    global next_id
-    data["id"] = next_id
-    next_id += 1
-    records.append(data)
-    save_all_data()
+@profiling.timed()
+def query_main_type(category):
+    """Main records of one type ("Symptoms", "Medicine", ...), as (source, row) pairs."""
+    key = make_key("main_type", type=category)
+    return cache.get_or_load(key, lambda: filter_main_type_rows(fetch_all_records(), category),
+                             tables=("main",))
+
+
+def filter_main_type_rows(rows, category):
+    # Stored types are canonical (schema.py), so an exact match is enough.
+    category = schema.canonical_enum("type", category) or category.strip()
+    return [(source, row) for source, row in rows
+            if source == "main" and row["type"] == category]
 
 
+def description_preview(row):
+    """Table text for a record's description (schema.preview()).
+
+    Snapshot rows decode only the first bytes of the text.
+    """
+    if hasattr(row, "description_preview"):
+        return row.description_preview()
+    return schema.preview(row["description"])
+
+
+def notify_change(source, op, record):
+    cache.invalidate(source)
+    for listener in change_listeners:
+        listener(source, op, record)
+
+
+# Changes run in store_transaction(), so they apply to what other windows
+# saved and allocate ids none of them has used. Each record carries a
+# "version"; an update that names the version it was based on fails with
+# locking.VersionConflict if someone else saved the record in between.
+@profiling.timed()
+def insert_record(data):
+    global next_id
+    data = schema.clean_record("main", data)
+    with store_transaction():
+        data["id"] = next_id
+        data["version"] = 1
+        next_id += 1
+        records.append(data)
+        save_all_data()
+    notify_change("main", "insert", data)
+    return data["id"]
+
+
+@profiling.timed()
 def update_record(record_id, data):
-    for r in records:
-        if r["id"] == record_id:
-            r.update(data)
-            break
-    save_all_data()
+    data = schema.clean_record("main", data, partial=True)
+    with store_transaction():
+        r = update_in("main", records, record_id, data)
+        save_all_data()
+    if r is not None:
+        notify_change("main", "update", r)
 
 
+@profiling.timed()
 def delete_record_db(record_id):
     global records
-    records = [r for r in records if r["id"] != record_id]
-    save_all_data()
+    with store_transaction():
+        records = [r for r in records if r["id"] != record_id]
+        save_all_data()
+    notify_change("main", "delete", {"id": record_id})
 
 
+@profiling.timed()
 def insert_wellness_record(data):
     global next_wellness_id
-    data["id"] = next_wellness_id
-    next_wellness_id += 1
-    wellness_records.append(data)
-    save_all_data()
+    data = schema.clean_record("wellness", data)
+    with store_transaction():
+        data["id"] = next_wellness_id
+        data["version"] = 1
+        next_wellness_id += 1
+        wellness_records.append(data)
+        save_all_data()
+    notify_change("wellness", "insert", data)
+    return data["id"]
+
+
+@profiling.timed()
+def update_wellness_record(record_id, data):
+    data = schema.clean_record("wellness", data, partial=True)
+    with store_transaction():
+        r = update_in("wellness", wellness_records, record_id, data)
+        save_all_data()
+    if r is not None:
+        notify_change("wellness", "update", r)
 
 
-def update_wellness_record(record_id, data):
-    for r in wellness_records:
+@profiling.timed()
+def delete_wellness_record_db(record_id):
+    global wellness_records
+    with store_transaction():
+        wellness_records = [r for r in wellness_records if r["id"] != record_id]
+        save_all_data()
+    notify_change("wellness", "delete", {"id": record_id})
+
+
+def update_in(source, rows, record_id, data):
+    """Update one record in place and bump its version; returns it (None if missing).
+
+    A "version" key in `data` is the version the change was based on.
+    """
+    expected = data.pop("version", None)
+    for r in rows:
         if r["id"] == record_id:
+            current = r.get("version", 0)
+            if expected is not None and expected != current:
+                raise locking.VersionConflict(source, record_id, expected, current)
             r.update(data)
-            break
-    save_all_data()
+            r["version"] = current + 1
+            return r
 
+    if expected is not None:
+        raise locking.VersionConflict(source, record_id, expected, None)
+    return None
+
+
+def apply_synced_change(source, op, record_id, data):
+    """Write a change pulled from MySQL into the local lists.
+
+    Used by sync.SyncEngine.apply(), which ignores the change notifications
+    this sends, so pulled rows are not pushed back. The caller saves once
+    per batch, inside store_transaction().
+    """
+    global records, wellness_records, next_id, next_wellness_id
+
+    if op == "delete":
+        if source == "main":
+            before, records = len(records), [r for r in records if r["id"] != record_id]
+            found = len(records) < before
+        else:
+            before, wellness_records = len(wellness_records), [r for r in wellness_records if r["id"] != record_id]
+            found = len(wellness_records) < before
+        if not found:
+            import archive
+            archive.forget(ARCHIVE_DIR, source, record_id)
+        notify_change(source, "delete", {"id": record_id})
+        return record_id
+
+    schema.clean_rows(source, [data])
+    rows = records if source == "main" else wellness_records
+    if record_id is not None:
+        r = update_in(source, rows, record_id, data)
+        if r is not None:
+            notify_change(source, "update", r)
+            return record_id
+        # Known id but not in the store: an archived record changed
+        # remotely. It comes back under its own id.
+    elif source == "main":
+        record_id, next_id = next_id, next_id + 1
+    else:
+        record_id, next_wellness_id = next_wellness_id, next_wellness_id + 1
+    r = dict(data, id=record_id, version=1)
+    rows.append(r)
+    notify_change(source, "insert", r)
+    return record_id
+
+
+# ===========================
+# BACKEND DISPATCH (JSON/MYSQL)
+# ===========================
+# JSON data-layer function -> its counterpart in DB/async_database.py
+MYSQL_EQUIVALENT = {
+    "insert_record": "insert_main_record",
+    "update_record": "update_main_record",
+    "delete_record_db": "delete_main_record",
+    "insert_wellness_record": "insert_wellness_record",
+    "update_wellness_record": "update_wellness_record",
+    "delete_wellness_record_db": "delete_wellness_record",
+}
+
+
+def apply_change(widget, fn, *args, on_done, on_failed=None):
+    """Run a data-layer change on the active backend, then call on_done().
+
+    With the MySQL backend the query runs in the background and on_done is
+    called on the Tk thread once it finishes (skipped if `widget` is gone).
+    On a database, validation or version-conflict error the error is shown
+    and on_failed() is called.
+    """
+    app = widget.winfo_toplevel()
+
+    def failed(error):
+        app.show_db_error(error)
+        if on_failed:
+            on_failed()
+
+    if BACKEND == "mysql":
+        coro = getattr(async_mysql_db(), MYSQL_EQUIVALENT[fn.__name__])(*args)
+        app.run_db(coro, lambda _: on_done(), widget=widget, on_error=failed)
+        return
+
+    try:
+        fn(*args)
+    except (schema.ValidationError, locking.VersionConflict, locking.LockTimeout) as e:
+        failed(e)
+        return
+    on_done()
+
+
+def load_rows(widget, on_rows):
+    """Pass the merged (source, row) list to on_rows(), fetching from MySQL
+    in parallel and off the Tk thread when that backend is active."""
+    if BACKEND == "mysql":
+        widget.winfo_toplevel().run_db(async_mysql_db().fetch_all_records(),
+                                       lambda rows: on_rows(remember_remote(rows)), widget=widget)
+    else:
+        on_rows(fetch_all_records())
+
+
+def remember_remote(rows):
+    remote_rows.clear()
+    remote_rows.update(((source, row["id"]), row) for source, row in rows)
+    return rows
+
+
+def find_record(source, record_id):
+    """The record a form is editing, from the active backend."""
+    if BACKEND == "mysql":
+        return remote_rows.get((source, record_id))
+
+    for rec in (records if source == "main" else wellness_records):
+        if rec["id"] == record_id:
+            return rec
+    return None
 
-def delete_wellness_record_db(record_id):
-    global wellness_records
-    wellness_records = [r for r in wellness_records if r["id"] != record_id]
-    save_all_data()
+
+def load_description(widget, source, record_id, on_text, on_error=None):
+    """Pass a record's full description to on_text() (None if the record is gone).
+
+    Tables only show a preview and MySQL lists only fetch the start of the
+    text, so forms get the full text here, off the Tk thread for MySQL. If
+    that query fails, on_error(e) is called instead.
+    """
+    if BACKEND == "mysql":
+        widget.winfo_toplevel().run_db(async_mysql_db().fetch_description(source, record_id),
+                                       on_text, widget=widget, on_error=on_error)
+        return
+    rec = find_record(source, record_id)
+    on_text(None if rec is None else rec["description"])
 
 
 # ===================
@@ -239,9 +709,249 @@ class HealthHubApp(tk.Tk):
         self.title("HealthHub: A Wellness Tracking System")
         self.geometry("980x620")
         self.configure(bg=BG_COLOR)
+        setup_styles(self)
+        self.start_background = None   # PhotoImage cached by StartScreen
         self.current_frame = None
+        self.overlay = None
+        self.bridge = None
+        self.sync_engine = None
+        self.sync_running = False
+        self.sync_error = None          # last error shown, so it is shown once
+        if BACKEND in ("mysql", "sync"):
+            from async_tk import AsyncBridge
+            self.bridge = AsyncBridge(self)
+        if BACKEND == "sync":
+            self.start_sync()
+        self.backups = None
+        if BACKEND != "mysql":
+            if ARCHIVE_AFTER_DAYS > 0:
+                try:
+                    archive_old_records()
+                except (OSError, locking.LockTimeout):
+                    pass        # keep everything in the store; retried next start
+            self.after(WATCH_INTERVAL_MS, self.watch_store)
+            if BACKUPS_ENABLED:
+                self.start_backups()
+        self.build_debug_menu()
         self.switch_frame(StartScreen)
 
+    # ------------------------------------------------
+    def start_sync(self):
+        change_listeners.append(self.record_sync_change)
+        self.after(0, self.sync_tick)
+
+    def claim_sync(self):
+        """Become the window that syncs this store, unless another window is.
+
+        The engine keeps its uid map and outbox in memory, so two windows on
+        one state file would each insert every pulled row and overwrite each
+        other's state. The lock is held until this window exits; the other
+        windows queue their changes for this one and retry every tick.
+        """
+        import sync
+
+        if not locking.lock_for(SYNC_LOCK_FILE).try_acquire():
+            return False
+        engine = sync.SyncEngine(mysql_db().get_connection, SYNC_STATE_FILE)
+        if not engine.seeded:
+            # Archived records are local records too; MySQL keeps them.
+            rows = {"main": list(records), "wellness": list(wellness_records)}
+            for source, row in search_archive(exclude=store_keys()):
+                rows[source].append(row)
+            engine.seed(rows)
+        self.sync_engine = engine
+        return True
+
+    def record_sync_change(self, source, op, record):
+        """Change listener: to our outbox, or queued for the window that syncs."""
+        if self.sync_engine is not None:
+            self.sync_engine.record_change(source, op, record)
+            return
+        import sync
+
+        with store_lock():
+            sync.queue_change(SYNC_QUEUE_FILE, source, op, record)
+
+    def sync_tick(self):
+        """Exchange changes with MySQL in the background, then reschedule."""
+        if self.sync_engine is None and not self.claim_sync():
+            self.title("HealthHub: A Wellness Tracking System (synced by another window)")
+        elif not self.sync_running:
+            try:
+                with store_lock():
+                    self.sync_engine.take_queued(SYNC_QUEUE_FILE)
+            except (OSError, locking.LockTimeout):
+                pass    # the queue stays; taken next tick
+            self.sync_running = True
+            coro = async_mysql_db().run_blocking(self.sync_engine.exchange)
+            self.run_db(coro, on_done=self.apply_sync, on_error=self.sync_failed)
+        self.after(SYNC_INTERVAL_MS, self.sync_tick)
+
+    def apply_sync(self, changes):
+        self.sync_running = False
+        try:
+            with store_transaction():
+                applied = self.sync_engine.apply(changes, apply_synced_change)
+                if applied:
+                    save_all_data()
+        except (OSError, locking.LockTimeout):
+            # On a lock timeout nothing was applied and the high-water mark
+            # did not move, so the rows are pulled again next tick. If only
+            # the save failed, the rows are in memory and the next save
+            # writes them.
+            self.title("HealthHub: A Wellness Tracking System (sync will retry)")
+            return
+        self.sync_error = None
+        self.title("HealthHub: A Wellness Tracking System")
+        if applied:
+            self.refresh_screen()
+
+    def sync_failed(self, error):
+        self.sync_running = False
+        if is_connection_error(error):
+            # Offline is normal for this backend: keep working locally and retry.
+            self.title("HealthHub: A Wellness Tracking System (offline)")
+            return
+        self.title("HealthHub: A Wellness Tracking System (sync error)")
+        if str(error) != self.sync_error:
+            self.sync_error = str(error)
+            messagebox.showerror("Sync", f"Syncing with MySQL failed; it is retried every "
+                                         f"{SYNC_INTERVAL_MS // 1000} seconds.\n\n{error}")
+
+    def watch_store(self):
+        """Reload records other HealthHub windows saved, then reschedule."""
+        if store_changed():
+            try:
+                with store_lock():
+                    changed = refresh_from_disk()
+            except locking.LockTimeout:
+                changed = []    # a long write is in progress; try again next tick
+            if changed:
+                self.refresh_screen()
+        self.after(WATCH_INTERVAL_MS, self.watch_store)
+
+    def refresh_screen(self):
+        """Redraw the current list screen after the records changed underneath it."""
+        if isinstance(self.current_frame, Dashboard):
+            self.current_frame.load_records()
+        elif isinstance(self.current_frame, SavedInfoScreen):
+            self.current_frame.load_saved_info()
+
+    def start_backups(self):
+        import backup
+
+        self.backups = backup.BackupManager(BACKUP_DIR, read_store_files)
+        change_listeners.append(self.backups.record_change)
+        self.after(0, self.backup_tick)
+
+    def backup_tick(self):
+        """Write collected changes on a background thread, then reschedule."""
+        if self.backups is not None:
+            self.backups.tick()
+            self.after(BACKUP_INTERVAL_MS, self.backup_tick)
+
+    def backup_now(self):
+        self.backups.request_base()
+        self.backups.tick()
+
+    def restore_backup(self):
+        import time
+        from tkinter import simpledialog
+        import backup
+
+        points = backup.restore_points(BACKUP_DIR)
+        if points is None:
+            messagebox.showinfo("Restore Backup", "There are no backups yet.")
+            return
+
+        earliest = time.strftime(schema.DATETIME_FORMAT, time.localtime(points[0]))
+        answer = simpledialog.askstring(
+            "Restore Backup", f"Restore the records as they were at\n(backups go back to {earliest}):",
+            initialvalue=time.strftime(schema.DATETIME_FORMAT), parent=self)
+        if answer is None:
+            return
+        point = schema.parse_datetime(answer)
+        if point is None:
+            messagebox.showwarning("Restore Backup", "Date/Time must look like 2025-12-11 10:00 AM.")
+            return
+        if not messagebox.askyesno("Restore Backup",
+                                   f"Replace all records with the backup from {answer.strip()}?"):
+            return
+
+        # Make sure the latest changes are in the backup files, then read
+        # them off the Tk thread and swap the records in back on it.
+        self.backups.close()
+        when = time.mktime(point.timetuple())
+
+        def restored(result):
+            apply_restored(*result)
+            self.backups.request_base()
+            self.refresh_screen()
+            messagebox.showinfo("Restore Backup", "Records restored.")
+
+        self.run_background(lambda: backup.restore_rows(BACKUP_DIR, when), restored,
+                            lambda e: messagebox.showerror("Restore Backup", str(e)))
+
+    def verify_backups(self):
+        import backup
+
+        def verified(problems):
+            if problems:
+                details = "\n".join(f"{name}: {problem}" for name, problem in problems[:15])
+                messagebox.showerror("Verify Backups", f"{len(problems)} problem(s) found:\n\n{details}")
+            else:
+                messagebox.showinfo("Verify Backups", "All backup files match their checksums.")
+
+        self.run_background(lambda: backup.verify(BACKUP_DIR), verified,
+                            lambda e: messagebox.showerror("Verify Backups", str(e)))
+
+    def run_background(self, fn, on_done, on_error):
+        """Run fn() on a worker thread; on_done(result) / on_error(e) run on the Tk thread."""
+        import threading
+
+        outcome = {}
+
+        def work():
+            try:
+                outcome["result"] = fn()
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+
+        def poll():
+            if thread.is_alive():
+                self.after(50, poll)
+            elif "error" in outcome:
+                on_error(outcome["error"])
+            else:
+                on_done(outcome["result"])
+
+        poll()
+
+    def run_db(self, coro, on_done=None, widget=None, on_error=None):
+        """Run a MySQL coroutine off the Tk thread; on_done(result) runs back on it."""
+        return self.bridge.submit(coro, on_done, on_error or self.show_db_error, widget)
+
+    def show_db_error(self, error):
+        if isinstance(error, schema.ValidationError):
+            messagebox.showwarning("Invalid Record", str(error))
+        elif isinstance(error, locking.VersionConflict):
+            messagebox.showwarning("Edit Conflict", str(error))
+        else:
+            messagebox.showerror("Database Error", str(error))
+
+    def destroy(self):
+        if self.backups is not None:
+            self.backups.close()
+            self.backups = None
+        if self.bridge is not None:
+            self.bridge.close()
+            async_mysql_db().shutdown()
+            self.bridge = None
+        super().destroy()
+
     def switch_frame(self, frame_class, **kwargs):
         global selected_index, selected_source, quick_type
 
@@ -250,35 +960,134 @@ class HealthHubApp(tk.Tk):
             selected_source = None
             quick_type = None
 
-        new_frame = frame_class(self, **kwargs)
-        if self.current_frame:
-            self.current_frame.destroy()
+        with profiling.span(f"switch_frame:{frame_class.__name__}"):
+            new_frame = frame_class(self, **kwargs)
+            if self.current_frame:
+                self.current_frame.destroy()
+
+            self.current_frame = new_frame
+            self.current_frame.pack(fill="both", expand=True)
+            if profiling.is_enabled():
+                self.update_idletasks()
+
+    # ------------------------------------------------
+    def build_debug_menu(self):
+        self.profiling_var = tk.BooleanVar(value=profiling.is_enabled())
+        menubar = tk.Menu(self)
+        debug = tk.Menu(menubar, tearoff=0)
+        debug.add_checkbutton(label="Enable Profiling", variable=self.profiling_var,
+                            command=lambda: profiling.set_enabled(self.profiling_var.get()))
+        debug.add_command(label="Show Profiling Overlay", command=self.show_overlay)
+        debug.add_command(label="Export Trace...", command=self.export_trace)
+        debug.add_command(label="Reset Profiling Data", command=profiling.reset)
+        debug.add_command(label="Clear Query Cache", command=cache.clear)
+        menubar.add_cascade(label="Debug", menu=debug)
+
+        if self.backups is not None:
+            backups = tk.Menu(menubar, tearoff=0)
+            backups.add_command(label="Back Up Now", command=self.backup_now)
+            backups.add_command(label="Restore to Point in Time...", command=self.restore_backup)
+            backups.add_command(label="Verify Backups", command=self.verify_backups)
+            menubar.add_cascade(label="Backups", menu=backups)
+        self.config(menu=menubar)
+
+    def show_overlay(self):
+        if self.overlay is None or not self.overlay.winfo_exists():
+            self.overlay = ProfilerOverlay(self)
+        self.overlay.lift()
+
+    def export_trace(self):
+        from tkinter import filedialog
+
+        # cProfile only runs when started with HEALTHHUB_PROFILE=cprofile;
+        # the menu toggle only turns on the span timers.
+        filetypes = [("speedscope", "*.speedscope.json")]
+        if profiling.cprofile_running():
+            filetypes.append(("cProfile stats", "*.prof"))
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export Trace", defaultextension=".speedscope.json",
+            filetypes=filetypes)
+        if not path:
+            return
+        try:
+            if path.endswith(".prof"):
+                profiling.export_pstats(path)
+            else:
+                profiling.export_speedscope(path)
+        except (OSError, RuntimeError) as e:
+            messagebox.showerror("Export Trace", str(e))
+
 
-        self.current_frame = new_frame
-        self.current_frame.pack(fill="both", expand=True)
+def setup_styles(root):
+    """Configure ttk styles once per Tk root instead of on every screen."""
+    style = ttk.Style(root)
+    style.theme_use("clam")
+    style.configure("Treeview", background=TREE_BG, foreground=TREE_FG,
+                    fieldbackground=TREE_BG, rowheight=28)
+    style.map("Treeview", background=[('selected', BTN_COLOR)])
+    style.configure("Saved.Treeview", rowheight=30)
 
 
 # ==================
-# START SCREEN
+# PROFILING OVERLAY
 # ==================
-class StartScreen(tk.Frame):
+class ProfilerOverlay(tk.Toplevel):
+    REFRESH_MS = 1000
+
     def __init__(self, master):
         super().__init__(master, bg=BG_COLOR)
+        self.title("HealthHub Profiling")
+        self.geometry("560x360")
+        self.attributes("-topmost", True)
+
+        self.text = tk.Text(self, bg=FRAME_BG, fg=LABEL_COLOR, font=("Courier New", 9),
+                            bd=0, state="disabled")
+        self.text.pack(fill="both", expand=True, padx=6, pady=6)
+        self.refresh()
+
+    def refresh(self):
+        lines = []
+        if not profiling.is_enabled():
+            lines.append("Profiling is off (Debug > Enable Profiling).\n")
+
+        lines.append(f"{'timer':<34}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, n, p50, p95, p99 in profiling.timing_summary():
+            lines.append(f"{name[:33]:<34}{n:>6}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}")
+
+        lines.append("")
+        lines.append(f"{'counter':<34}{'total':>10}{'p50':>8}{'p95':>8}")
+        for name, total, p50, p95 in profiling.counter_summary():
+            lines.append(f"{name[:33]:<34}{total:>10}{p50:>8.0f}{p95:>8.0f}")
+
+        stats = cache.stats()
+        lines.append("")
+        lines.append(f"query cache: {stats['hits']} hits, {stats['misses']} misses "
+                     f"({stats['hit_rate']:.0%}), {stats['entries']} entries, "
+                     f"{stats['bytes'] // 1024} KiB, {stats['evictions']} evicted, "
+                     f"{stats['invalidations']} invalidated, {stats['stale_loads']} stale loads dropped")
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.configure(state="disabled")
+        self.after(self.REFRESH_MS, self.refresh)
 
-        # Load background image
-        image_path = "IMAGE/FRONT PAGE.png"
-        if os.path.exists(image_path):
-            self.bg_image = Image.open(image_path)
-        else:
-            self.bg_image = Image.new("RGB", (1280, 800), BG_COLOR)  # fallback
 
-        self.bg_image = self.bg_image.resize((1280, 800), Image.LANCZOS)
-        self.bg_photo = ImageTk.PhotoImage(self.bg_image)
+# ==================
+# START SCREEN
+# ==================
+class StartScreen(tk.Frame):
+    def __init__(self, master):
+        super().__init__(master, bg=BG_COLOR)
 
-        # Canvas for background
-        self.canvas = tk.Canvas(self, width=980, height=620)
+        # Canvas for background (the image is loaded after the first redraw)
+        self.canvas = tk.Canvas(self, width=980, height=620, bg=BG_COLOR, highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
-        self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
+        self.bg_item = self.canvas.create_image(0, 0, anchor="nw")
+        if master.start_background is not None:
+            self.canvas.itemconfigure(self.bg_item, image=master.start_background)
+        else:
+            self.canvas.bind("<Expose>", self.first_expose)
 
         # Overlay text
         self.canvas.create_text(700, 200, text="HealthHub: A Wellness Tracking \nand Information System",
@@ -293,6 +1102,28 @@ class StartScreen(tk.Frame):
         self.canvas.create_window(650, 400, window=start_btn)
         self.canvas.create_window(650, 460, window=about_btn)
 
+    def first_expose(self, event):
+        # Tk has queued the canvas redraw by now; the image load goes after it.
+        self.canvas.unbind("<Expose>")
+        self.after_idle(self.load_background)
+
+    def load_background(self):
+        # Pillow is only needed here, so import it on first use.
+        from PIL import Image, ImageTk
+
+        if not self.winfo_exists():
+            return
+
+        image_path = "IMAGE/FRONT PAGE.png"
+        if os.path.exists(image_path):
+            bg_image = Image.open(image_path)
+        else:
+            bg_image = Image.new("RGB", (1280, 800), BG_COLOR)  # fallback
+
+        bg_image = bg_image.resize((1280, 800), Image.LANCZOS)
+        self.master.start_background = ImageTk.PhotoImage(bg_image)
+        self.canvas.itemconfigure(self.bg_item, image=self.master.start_background)
+
 
 # ==================
 # ABOUT SCREEN
@@ -358,7 +1189,11 @@ class Dashboard(tk.Frame):
                 command=lambda: self.load_records(True)).pack(pady=4)
 
         tk.Button(left, text="Saved Info", font=("Courier New", 9), width=19, bg=BTN_COLOR, fg="white",
-                command=lambda: master.switch_frame(SavedInfoScreen)).pack(pady=20)
+                command=lambda: master.switch_frame(SavedInfoScreen)).pack(pady=(20, 4))
+
+        if BACKEND != "mysql":
+            tk.Button(left, text="View Archive", font=("Courier New", 9), width=19, bg=BTN_COLOR, fg="white",
+                    command=lambda: master.switch_frame(ArchiveScreen)).pack(pady=(4, 20))
 
         # === ACTIONS ===
         tk.Label(left, text="ACTIONS", font=("Times New Roman", 15, "bold"),
@@ -378,12 +1213,6 @@ class Dashboard(tk.Frame):
         widths = [60, 120, 120, 250, 120, 100]
         self.tree = ttk.Treeview(center, columns=columns, show="headings")
 
-        style = ttk.Style()
-        style.theme_use("clam")
-        style.configure("Treeview", background=TREE_BG, foreground=TREE_FG,
-                        fieldbackground=TREE_BG, rowheight=28)
-        style.map("Treeview", background=[('selected', BTN_COLOR)])
-
         for col, w in zip(columns, widths):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=w, anchor="center")
@@ -423,34 +1252,48 @@ class Dashboard(tk.Frame):
             self.master.switch_frame(RecordForm)
 
     def load_records(self, wellness_only=False):
+        load_rows(self, lambda rows: self.show_records(rows, wellness_only))
+
+    @profiling.timed("Dashboard.load_records")
+    def show_records(self, rows, wellness_only=False):
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for source, row in fetch_all_records():
+        inserted = 0
+        for source, row in rows:
             if wellness_only and source != "wellness":
                 continue
+            inserted += 1
 
             if source == "main":
                 self.tree.insert("", "end", iid=f"main_{row['id']}", values=(
-                    row["id"], row["label"], row["type"], row["description"],
+                    row["id"], row["label"], row["type"], description_preview(row),
                     row["datetime"], row["severity"]
                 ))
             else:
                 self.tree.insert("", "end", iid=f"well_{row['id']}", values=(
                     row["id"], row["label"], f"Wellness ({row['category']})",
-                    row["description"], row["datetime"], row["frequency"]
+                    description_preview(row), row["datetime"], row["frequency"]
                 ))
+        profiling.count("treeview.insert:Dashboard", inserted)
 
     def filter_main_type(self, category):
+        if BACKEND == "mysql":
+            load_rows(self, lambda rows: self.show_main_type(filter_main_type_rows(rows, category)))
+        else:
+            self.show_main_type(query_main_type(category))
+
+    @profiling.timed("Dashboard.filter_main_type")
+    def show_main_type(self, rows):
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for source, row in fetch_all_records():
-            if source == "main" and row["type"].lower() == category.lower():
-                self.tree.insert("", "end", iid=f"main_{row['id']}", values=(
-                    row["id"], row["label"], row["type"], row["description"],
-                    row["datetime"], row["severity"]
-                ))
+        for source, row in rows:
+            self.tree.insert("", "end", iid=f"main_{row['id']}", values=(
+                row["id"], row["label"], row["type"], description_preview(row),
+                row["datetime"], row["severity"]
+            ))
+        profiling.count("treeview.insert:Dashboard", len(rows))
 
     def edit_selected(self):
         global selected_index, selected_source
@@ -478,11 +1321,9 @@ class Dashboard(tk.Frame):
         iid = selected[0]
 
         if iid.startswith("main_"):
-            delete_record_db(int(iid.split("_")[1]))
+            apply_change(self, delete_record_db, int(iid.split("_")[1]), on_done=self.load_records)
         else:
-            delete_wellness_record_db(int(iid.split("_")[1]))
-
-        self.load_records()
+            apply_change(self, delete_wellness_record_db, int(iid.split("_")[1]), on_done=self.load_records)
 
 
 # ==========================
@@ -512,12 +1353,8 @@ class SavedInfoScreen(tk.Frame):
 
         columns = ("ID No.", "Name", "Type", "Description", "Date/Time", "Severity/Freq")
         widths = [60, 120, 140, 250, 140, 100]
-        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings")
-
-        style = ttk.Style()
-        style.theme_use("clam")
-        style.configure("Treeview", background=TREE_BG, foreground=TREE_FG,
-                        fieldbackground=TREE_BG, rowheight=30)
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings",
+                                style="Saved.Treeview")
 
         for col, w in zip(columns, widths):
             self.tree.heading(col, text=col)
@@ -527,20 +1364,151 @@ class SavedInfoScreen(tk.Frame):
         self.load_saved_info()
 
     def load_saved_info(self):
+        load_rows(self, self.show_saved_info)
+
+    @profiling.timed("SavedInfoScreen.load_saved_info")
+    def show_saved_info(self, rows):
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for source, row in fetch_all_records():
+        for source, row in rows:
             if source == "main":
                 self.tree.insert("", "end", values=(
-                    row["id"], row["label"], row["type"], row["description"],
+                    row["id"], row["label"], row["type"], description_preview(row),
                     row["datetime"], row["severity"]
                 ))
             else:
                 self.tree.insert("", "end", values=(
                     row["id"], row["label"], f"Wellness ({row['category']})",
-                    row["description"], row["datetime"], row["frequency"]
+                    description_preview(row), row["datetime"], row["frequency"]
                 ))
+        profiling.count("treeview.insert:SavedInfo", len(rows))
+
+
+# ==========================
+# ARCHIVE SCREEN
+# ==========================
+class ArchiveScreen(tk.Frame):
+    """Search over archived records (archive.py); selected ones can be restored."""
+
+    KINDS = ("All", "Symptoms", "Medicine", "Appointment", "Wellness")
+
+    def __init__(self, master):
+        super().__init__(master, bg=BG_COLOR)
+
+        tk.Button(
+            self, text="←", font=("Arial", 20, "bold"),
+            bg=BG_COLOR, fg="white", bd=0,
+            command=lambda: master.switch_frame(Dashboard)
+        ).pack(anchor="nw", padx=10, pady=10)
+
+        tk.Label(
+            self, text="ARCHIVE",
+            font=("Times New Roman", 30, "bold"),
+            bg=BG_COLOR, fg="white"
+        ).pack(pady=5)
+
+        bar = tk.Frame(self, bg=BG_COLOR)
+        bar.pack(fill="x", padx=20)
+
+        self.search_entry = tk.Entry(bar, font=("Courier New", 11), width=30,
+                                     bg=ENTRY_BG, fg=ENTRY_FG, insertbackground=ENTRY_FG)
+        self.search_entry.pack(side="left", padx=(0, 8))
+        self.search_entry.bind("<Return>", lambda e: self.search())
+
+        self.kind_box = ttk.Combobox(bar, values=self.KINDS, state="readonly", width=14)
+        self.kind_box.current(0)
+        self.kind_box.pack(side="left", padx=(0, 8))
+
+        self.search_button = tk.Button(bar, text="Search", font=("Courier New", 9), width=12,
+                                       bg=BTN_COLOR, fg="white", command=self.search)
+        self.search_button.pack(side="left")
+
+        self.restore_button = tk.Button(bar, text="Restore to store", font=("Courier New", 9), width=16,
+                                        bg=BTN_COLOR, fg="white", command=self.restore_selected)
+        self.restore_button.pack(side="left", padx=(8, 0))
+
+        self.status = tk.Label(bar, bg=BG_COLOR, fg=LABEL_COLOR, font=("Courier New", 9))
+        self.status.pack(side="right")
+
+        outer = tk.Frame(self, bg=FRAME_BG, bd=3, relief="solid")
+        outer.pack(fill="both", expand=True, padx=20, pady=20)
+
+        columns = ("ID No.", "Name", "Type", "Description", "Date/Time", "Severity/Freq")
+        widths = [60, 120, 140, 250, 140, 100]
+        self.tree = ttk.Treeview(outer, columns=columns, show="headings", style="Saved.Treeview")
+        for col, w in zip(columns, widths):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=w, anchor="center")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.results = {}       # tree item -> (source, archived row)
+
+        import archive
+        counts = archive.read_index(ARCHIVE_DIR)["counts"]
+        age = f"older than {ARCHIVE_AFTER_DAYS} days" if ARCHIVE_AFTER_DAYS > 0 else "archiving is off"
+        self.status.config(text=f"{sum(counts.values())} records archived ({age})")
+
+    def search(self):
+        text = self.search_entry.get()
+        kind = self.kind_box.get()
+        kind = None if kind == "All" else kind
+        exclude = store_keys()
+
+        self.search_button.config(state="disabled")
+        self.status.config(text="Searching...")
+        self.master.run_background(lambda: search_archive(text, kind, exclude),
+                                   self.show_results, self.search_failed)
+
+    def search_failed(self, error):
+        if not self.winfo_exists():
+            return
+        self.search_button.config(state="normal")
+        self.status.config(text="")
+        messagebox.showerror("Archive", str(error))
+
+    @profiling.timed("ArchiveScreen.show_results")
+    def show_results(self, rows):
+        if not self.winfo_exists():
+            return
+        self.search_button.config(state="normal")
+        self.status.config(text=f"{len(rows)} archived records found")
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.results = {}
+
+        for source, row in rows:
+            item = f"{source}:{row['id']}"
+            self.results[item] = (source, row)
+            if source == "main":
+                self.tree.insert("", "end", iid=item, values=(
+                    row["id"], row["label"], row["type"], description_preview(row),
+                    row["datetime"], row["severity"]
+                ))
+            else:
+                self.tree.insert("", "end", iid=item, values=(
+                    row["id"], row["label"], f"Wellness ({row['category']})",
+                    description_preview(row), row["datetime"], row["frequency"]
+                ))
+        profiling.count("treeview.insert:Archive", len(rows))
+
+    def restore_selected(self):
+        """Move the selected archived records back into the store."""
+        selected = self.tree.selection()
+        if not selected:
+            messagebox.showwarning("Archive", "Select the records to restore first.")
+            return
+
+        restored = 0
+        try:
+            for item in selected:
+                if restore_archived(*self.results[item]):
+                    restored += 1
+                self.tree.delete(item)
+                del self.results[item]
+        except (OSError, locking.LockTimeout) as e:
+            messagebox.showerror("Archive", f"Could not restore the records: {e}")
+        self.status.config(text=f"{restored} records restored to the store")
 
 
 # ======================
@@ -568,7 +1536,6 @@ class RecordForm(tk.Frame):
         self.entry_desc = tk.Text(form, width=30, height=3, bg=ENTRY_BG, fg=ENTRY_FG,
                                 insertbackground=ENTRY_FG)
         self.entry_desc.pack()
-        self.entry_desc.insert("1.0", " ")
 
         self.entry_datetime = self.create_entry(form, "Date/Time:")
 
@@ -603,9 +1570,10 @@ class RecordForm(tk.Frame):
         btns = tk.Frame(self, bg=BG_COLOR)
         btns.pack(side="right", padx=60, pady=20)
 
-        tk.Button(btns, text="SAVE", font=("Courier New", 9), width=19,
-                bg=BTN_COLOR, fg="white",
-                command=self.save_record).pack(pady=5)
+        self.save_btn = tk.Button(btns, text="SAVE", font=("Courier New", 9), width=19,
+                                bg=BTN_COLOR, fg="white",
+                                command=self.save_record)
+        self.save_btn.pack(pady=5)
 
         tk.Button(btns, text="CANCEL", font=("Courier New", 9), width=19,
                 bg=BTN_COLOR, fg="white",
@@ -624,6 +1592,7 @@ class RecordForm(tk.Frame):
         self.entry_type.bind("<FocusOut>", lambda e: self.toggle_wellness_mode())
 
         # Load editing data
+        self.edit_version = None    # version of the record being edited
         if selected_index is not None and selected_source == "main":
             self.load_edit_data_main()
 
@@ -654,14 +1623,29 @@ class RecordForm(tk.Frame):
 
     # -------------------------------------------------------
     def load_edit_data_main(self):
-        for rec in records:
-            if rec["id"] == selected_index:
-                self.entry_name.insert(0, rec["label"])
-                self.entry_type.insert(0, rec["type"])
-                self.entry_desc.insert("1.0", rec["description"])
-                self.entry_datetime.insert(0, rec["datetime"])
-                self.entry_severity.set(rec["severity"])
-                break
+        rec = find_record("main", selected_index)
+        if rec is not None:
+            self.edit_version = rec.get("version", 0)
+            self.entry_name.insert(0, rec["label"])
+            self.entry_type.insert(0, rec["type"])
+            self.entry_datetime.insert(0, rec["datetime"])
+            self.entry_severity.set(rec["severity"])
+            self.save_btn.configure(state="disabled")   # until the full text is in
+            load_description(self, "main", selected_index, self.show_description,
+                             self.description_failed)
+
+    def show_description(self, text):
+        self.entry_desc.insert("1.0", text or "")
+        self.save_btn.configure(state="normal")
+
+    def description_failed(self, error):
+        # Saving without the full text would overwrite it, so SAVE only
+        # comes back once it has loaded.
+        if messagebox.askretrycancel("Load Description", f"Could not load the description:\n{error}"):
+            load_description(self, "main", selected_index, self.show_description,
+                             self.description_failed)
+        else:
+            self.master.switch_frame(Dashboard)
 
     # -------------------------------------------------------
     def save_record(self):
@@ -672,38 +1656,41 @@ class RecordForm(tk.Frame):
 
         if is_wellness:
             data = {
-                "label": self.entry_name.get().strip(),
+                "label": self.entry_name.get(),
                 "category": self.entry_category.get(),
                 "frequency": self.entry_frequency.get(),
-                "description": self.entry_desc.get("1.0", "end-1c").strip(),
-                "datetime": self.entry_datetime.get().strip()
+                "description": self.entry_desc.get("1.0", "end-1c"),
+                "datetime": self.entry_datetime.get()
             }
 
             if selected_index is not None and selected_source == "wellness":
-                update_wellness_record(selected_index, data)
+                change = (update_wellness_record, selected_index, data)
             else:
-                insert_wellness_record(data)
+                change = (insert_wellness_record, data)
 
         else:
             data = {
-                "label": self.entry_name.get().strip(),
-                "type": self.entry_type.get().strip(),
-                "description": self.entry_desc.get("1.0", "end-1c").strip(),
-                "datetime": self.entry_datetime.get().strip(),
+                "label": self.entry_name.get(),
+                "type": self.entry_type.get(),
+                "description": self.entry_desc.get("1.0", "end-1c"),
+                "datetime": self.entry_datetime.get(),
                 "severity": self.entry_severity.get()
             }
 
             if selected_index is not None and selected_source == "main":
-                update_record(selected_index, data)
+                data["version"] = self.edit_version
+                change = (update_record, selected_index, data)
             else:
-                insert_record(data)
+                change = (insert_record, data)
 
-        self.master.switch_frame(Dashboard)
+        self.save_btn.configure(state="disabled")
+        apply_change(self, *change, on_done=lambda: self.master.switch_frame(Dashboard),
+                     on_failed=lambda: self.save_btn.configure(state="normal"))
 
     # -------------------------------------------------------
     def delete_record(self):
-        delete_record_db(selected_index)
-        self.master.switch_frame(Dashboard)
+        apply_change(self, delete_record_db, selected_index,
+                     on_done=lambda: self.master.switch_frame(Dashboard))
 
 
 # ======================
@@ -744,16 +1731,16 @@ class WellnessHabitsForm(tk.Frame):
         self.entry_desc = tk.Text(form, width=30, height=3,
                                 bg=ENTRY_BG, fg=ENTRY_FG, insertbackground=ENTRY_FG)
         self.entry_desc.pack()
-        self.entry_desc.insert("1.0", "")
 
         self.entry_datetime = self.create_entry(form, "Date/Time:")
 
         btns = tk.Frame(self, bg=BG_COLOR)
         btns.pack(side="right", padx=60)
 
-        tk.Button(btns, text="SAVE", font=("Courier New", 9), width=19,
-                bg=BTN_COLOR, fg="white",
-                command=self.save_record).pack(pady=5)
+        self.save_btn = tk.Button(btns, text="SAVE", font=("Courier New", 9), width=19,
+                                bg=BTN_COLOR, fg="white",
+                                command=self.save_record)
+        self.save_btn.pack(pady=5)
 
         tk.Button(btns, text="CANCEL", font=("Courier New", 9), width=19,
                 bg=BTN_COLOR, fg="white",
@@ -768,6 +1755,7 @@ class WellnessHabitsForm(tk.Frame):
                 bg=BTN_COLOR, fg="white",
                 command=lambda: master.switch_frame(Dashboard)).pack(pady=5)
 
+        self.edit_version = None    # version of the record being edited
         if selected_index is not None and selected_source == "wellness":
             self.load_edit_data_wellness()
         elif quick_type == "WELLNESS_FORM":
@@ -782,36 +1770,54 @@ class WellnessHabitsForm(tk.Frame):
 
     # -----------------------------------------
     def load_edit_data_wellness(self):
-        for rec in wellness_records:
-            if rec["id"] == selected_index:
-                self.entry_name.insert(0, rec["label"])
-                self.entry_category.set(rec["category"])
-                self.entry_frequency.set(rec["frequency"])
-                self.entry_desc.insert("1.0", rec["description"])
-                self.entry_datetime.insert(0, rec["datetime"])
-                break
+        rec = find_record("wellness", selected_index)
+        if rec is not None:
+            self.edit_version = rec.get("version", 0)
+            self.entry_name.insert(0, rec["label"])
+            self.entry_category.set(rec["category"])
+            self.entry_frequency.set(rec["frequency"])
+            self.entry_datetime.insert(0, rec["datetime"])
+            self.save_btn.configure(state="disabled")   # until the full text is in
+            load_description(self, "wellness", selected_index, self.show_description,
+                             self.description_failed)
+
+    def show_description(self, text):
+        self.entry_desc.insert("1.0", text or "")
+        self.save_btn.configure(state="normal")
+
+    def description_failed(self, error):
+        # Saving without the full text would overwrite it, so SAVE only
+        # comes back once it has loaded.
+        if messagebox.askretrycancel("Load Description", f"Could not load the description:\n{error}"):
+            load_description(self, "wellness", selected_index, self.show_description,
+                             self.description_failed)
+        else:
+            self.master.switch_frame(Dashboard)
 
     # -----------------------------------------
     def save_record(self):
         data = {
-            "label": self.entry_name.get().strip(),
+            "label": self.entry_name.get(),
             "category": self.entry_category.get(),
             "frequency": self.entry_frequency.get(),
-            "description": self.entry_desc.get("1.0", "end-1c").strip(),
-            "datetime": self.entry_datetime.get().strip()
+            "description": self.entry_desc.get("1.0", "end-1c"),
+            "datetime": self.entry_datetime.get()
         }
 
         if selected_index is not None and selected_source == "wellness":
-            update_wellness_record(selected_index, data)
+            data["version"] = self.edit_version
+            change = (update_wellness_record, selected_index, data)
         else:
-            insert_wellness_record(data)
+            change = (insert_wellness_record, data)
 
-        self.master.switch_frame(Dashboard)
+        self.save_btn.configure(state="disabled")
+        apply_change(self, *change, on_done=lambda: self.master.switch_frame(Dashboard),
+                     on_failed=lambda: self.save_btn.configure(state="normal"))
 
     # -----------------------------------------
     def delete_record(self):
-        delete_wellness_record_db(selected_index)
-        self.master.switch_frame(Dashboard)
+        apply_change(self, delete_wellness_record_db, selected_index,
+                     on_done=lambda: self.master.switch_frame(Dashboard))
 
 
 # ---------------------------
@@ -0,0 +1,203 @@
+# =================================
+# OPT-IN PROFILING / INSTRUMENTATION
+# =================================
+# Off by default. Turn it on with HEALTHHUB_PROFILE=1 (or =cprofile to also
+# run cProfile) or from the Debug menu. When off, every hook is a single
+# flag check.
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+_MODE = os.environ.get("HEALTHHUB_PROFILE", "").strip().lower()
+
+ENABLED = _MODE in ("1", "true", "yes", "on", "cprofile")
+WINDOW = 500            # rolling samples kept per name for percentiles
+MAX_SPANS = 200000      # spans kept for trace export
+
+_lock = threading.Lock()
+_durations = defaultdict(lambda: deque(maxlen=WINDOW))   # name -> seconds
+_values = defaultdict(lambda: deque(maxlen=WINDOW))      # name -> per-call counts
+_counters = Counter()
+_spans = deque(maxlen=MAX_SPANS)                         # (thread, name, start, end)
+_origin = time.perf_counter()
+_cprofile = None
+
+
+def set_enabled(flag):
+    global ENABLED
+    ENABLED = bool(flag)
+
+
+def is_enabled():
+    return ENABLED
+
+
+def cprofile_running():
+    return _cprofile is not None
+
+
+def start_cprofile():
+    """Run cProfile alongside the span timers (HEALTHHUB_PROFILE=cprofile)."""
+    global _cprofile
+    if _cprofile is None:
+        _cprofile = cProfile.Profile()
+        _cprofile.enable()
+
+
+def _record(name, start, end):
+    with _lock:
+        _durations[name].append(end - start)
+        _spans.append((threading.get_ident(), name, start, end))
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block under `name`."""
+    if not ENABLED:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter())
+
+
+def timed(name=None):
+    """Decorator that records each call's duration."""
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(label, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Add n to a counter and keep n as one sample (e.g. inserts per refresh)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] += n
+        _values[name].append(n)
+
+
+def reset():
+    with _lock:
+        _durations.clear()
+        _values.clear()
+        _counters.clear()
+        _spans.clear()
+
+
+# ======================
+# SUMMARIES
+# ======================
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def timing_summary():
+    """[(name, calls_in_window, p50_ms, p95_ms, p99_ms)] sorted by p95."""
+    with _lock:
+        snapshot = {name: sorted(d) for name, d in _durations.items()}
+
+    rows = []
+    for name, values in snapshot.items():
+        rows.append((name, len(values),
+                     _percentile(values, 50) * 1000,
+                     _percentile(values, 95) * 1000,
+                     _percentile(values, 99) * 1000))
+    rows.sort(key=lambda r: r[3], reverse=True)
+    return rows
+
+
+def counter_summary():
+    """[(name, total, p50, p95)] for counters."""
+    with _lock:
+        snapshot = {name: (_counters[name], sorted(v)) for name, v in _values.items()}
+
+    return sorted((name, total, _percentile(v, 50), _percentile(v, 95))
+                  for name, (total, v) in snapshot.items())
+
+
+# ======================
+# TRACE EXPORT
+# ======================
+def export_speedscope(path):
+    """Write recorded spans as a speedscope evented profile (one per thread)."""
+    with _lock:
+        spans = list(_spans)
+
+    frames, frame_index = [], {}
+    by_thread = defaultdict(list)
+    for thread, name, start, end in spans:
+        if name not in frame_index:
+            frame_index[name] = len(frames)
+            frames.append({"name": name})
+        by_thread[thread].append((start, end, frame_index[name]))
+
+    profiles = []
+    for thread, items in by_thread.items():
+        # Outer spans first when they start together, so events nest properly.
+        items.sort(key=lambda s: (s[0], -s[1]))
+        events, stack = [], []
+        for start, end, frame in items:
+            while stack and stack[-1][0] <= start:
+                close_at, close_frame = stack.pop()
+                events.append({"type": "C", "frame": close_frame, "at": (close_at - _origin) * 1000})
+            events.append({"type": "O", "frame": frame, "at": (start - _origin) * 1000})
+            stack.append((end, frame))
+        while stack:
+            close_at, close_frame = stack.pop()
+            events.append({"type": "C", "frame": close_frame, "at": (close_at - _origin) * 1000})
+
+        profiles.append({
+            "type": "evented",
+            "name": f"HealthHub thread {thread}",
+            "unit": "milliseconds",
+            "startValue": events[0]["at"] if events else 0,
+            "endValue": events[-1]["at"] if events else 0,
+            "events": events,
+        })
+
+    with open(path, "w") as f:
+        json.dump({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": "HealthHub",
+            "exporter": "healthhub-profiling",
+        }, f)
+
+
+def export_pstats(path):
+    """Dump cProfile stats (readable by pstats, snakeviz, speedscope)."""
+    if _cprofile is None:
+        raise RuntimeError("cProfile is not running; start with HEALTHHUB_PROFILE=cprofile.")
+    _cprofile.disable()
+    _cprofile.dump_stats(path)
+    _cprofile.enable()
+
+
+if _MODE == "cprofile":
+    start_cprofile()
@@ -0,0 +1,159 @@
+# =========================
+# READ-THROUGH QUERY CACHE
+# =========================
+# Results of read queries are kept in an LRU keyed on the normalized query
+# parameters. Each entry is tagged with the tables it read, and the
+# insert/update/delete functions of both backends invalidate exactly those
+# tables. A memory bound and an optional TTL (for MySQL results that other
+# workstations may change) limit staleness and size.
+#
+# Every table has a generation that invalidate() bumps. A loader reads the
+# generations before it queries and passes them to put(), which drops the
+# result if a write invalidated one of its tables in the meantime, so a
+# slow fetch can never cache rows older than a write it overlapped.
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 256
+MAX_BYTES = 32 * 1024 * 1024
+ROW_OVERHEAD = 64        # a cached row is a shared reference plus its tuple
+
+
+def normalize(value):
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def make_key(name, **params):
+    """("name", (("param", normalized value), ...)), independent of kwarg order and case."""
+    return (name, tuple(sorted((k, normalize(v)) for k, v in params.items())))
+
+
+def estimate_size(value, owned=False):
+    """Rough bytes held by a cached result.
+
+    Rows of local queries are shared with the store, so only the container
+    and one reference/tuple per row are counted. With owned=True (MySQL
+    results, which nothing else holds) the rows themselves are counted too.
+    """
+    if not isinstance(value, (list, tuple)):
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value) + ROW_OVERHEAD * len(value)
+    if owned:
+        size += sum(row_size(row) for row in value)
+    return size
+
+
+def row_size(row):
+    if isinstance(row, dict):
+        return sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+    return sys.getsizeof(row)
+
+
+class QueryCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()    # key -> (value, tables, size, expires)
+        self._by_table = {}              # table -> set of keys
+        self._generations = {}           # table -> times it was invalidated
+        self._epoch = 0                  # times the whole cache was cleared
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self.stale_loads = 0
+
+    def get(self, key):
+        """Cached value or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is not None and entry[3] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self, tables):
+        """Token for put(generation=...); read it before running the query."""
+        with self._lock:
+            return self._epoch, tuple(self._generations.get(t, 0) for t in tables)
+
+    def put(self, key, value, tables, ttl=None, generation=None, owned=False):
+        """Cache `value`, unless `generation` shows one of `tables` was
+        invalidated (or the cache cleared) since it was taken."""
+        size = estimate_size(value, owned)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if generation is not None and generation != (
+                    self._epoch, tuple(self._generations.get(t, 0) for t in tables)):
+                self.stale_loads += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, tuple(tables), size, expires)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_load(self, key, load, tables, ttl=None, owned=False):
+        value = self.get(key)
+        if value is None:
+            generation = self.generation(tables)
+            value = load()
+            self.put(key, value, tables, ttl, generation, owned)
+        return value
+
+    def invalidate(self, table):
+        """Forget every result that read `table`."""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in self._by_table.pop(table, ()):
+                if key in self._entries:
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+            self._epoch += 1
+
+    def _drop(self, key):
+        _value, tables, size, _expires = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_loads": self.stale_loads,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Shared by main.py (JSON store) and DB/database.py (MySQL).
+cache = QueryCache()
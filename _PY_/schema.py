@@ -0,0 +1,213 @@
+# ================================
+# RECORD VALIDATION / NORMALIZATION
+# ================================
+# Every record is normalized once, when it enters the data layer:
+#   * text is trimmed (older files have labels and datetimes ending in "\n")
+#   * enum fields use their canonical spelling ("symptoms " -> "Symptoms")
+#   * datetimes are parsed once and stored as "YYYY-MM-DD HH:MM AM"
+# so screens, filters and the query cache can compare values as-is.
+#
+# clean_record() validates a single record on write and raises
+# ValidationError. clean_rows() is the lenient pass run over whole files on
+# load: it fixes what it can and keeps values it does not understand.
+import re
+from datetime import datetime
+from functools import lru_cache
+
+MAIN_TYPES = ("Symptoms", "Medicine", "Appointment")
+SEVERITIES = ("Mild", "Moderate", "Critical")
+CATEGORIES = ("Exercise", "Nutrition", "Sleep", "Self-Care", "Mental Wellness", "Hygiene")
+FREQUENCIES = ("Daily", "Weekly", "Routine", "Sometimes")
+
+TEXT_FIELDS = {"main": ("label", "description"), "wellness": ("label", "description")}
+ENUM_FIELDS = {
+    "main": {"type": MAIN_TYPES, "severity": SEVERITIES},
+    "wellness": {"category": CATEGORIES, "frequency": FREQUENCIES},
+}
+REQUIRED = {
+    "main": ("label", "type", "description", "datetime", "severity"),
+    "wellness": ("label", "category", "frequency", "description", "datetime"),
+}
+
+# Extra spellings accepted for the free-text "Type" entry.
+ALIASES = {
+    "symptom": "Symptoms",
+    "medicines": "Medicine",
+    "medication": "Medicine",
+    "appointments": "Appointment",
+}
+
+# Tables show the start of a description; preview() never reads more than
+# PREVIEW_SOURCE_CHARS (+1 to tell whether there is more).
+PREVIEW_CHARS = 60
+PREVIEW_SOURCE_CHARS = 2 * PREVIEW_CHARS
+
+DATETIME_FORMAT = "%Y-%m-%d %I:%M %p"
+DATE_FORMAT = "%Y-%m-%d"
+CANONICAL_DATETIME_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?: (?:0[1-9]|1[0-2]):[0-5]\d [AP]M)?")
+DATETIME_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:\s+(\d{1,2}):(\d{2})(?:\s*([AaPp][Mm]))?)?$")
+
+
+class ValidationError(ValueError):
+    pass
+
+
+def _lookup(values, aliases=None):
+    table = {v.lower(): v for v in values}
+    table.update(aliases or {})
+    return table
+
+
+LOOKUPS = {
+    "type": _lookup(MAIN_TYPES, ALIASES),
+    "severity": _lookup(SEVERITIES),
+    "category": _lookup(CATEGORIES),
+    "frequency": _lookup(FREQUENCIES),
+}
+
+
+def canonical_enum(field, value):
+    """Canonical spelling of an enum value, or None if it is not one."""
+    if not isinstance(value, str):
+        return None
+    return LOOKUPS[field].get(" ".join(value.split()).lower())
+
+
+@lru_cache(maxsize=65536)
+def parse_datetime(text):
+    """datetime for "2025-12-11 10:00 AM", "2025-12-11 22:00" or "2025-12-11"; None otherwise."""
+    m = DATETIME_RE.match(text.strip())
+    if not m:
+        return None
+
+    year, month, day, hour, minute, ampm = m.groups()
+    hour, minute = int(hour or 0), int(minute or 0)
+    if ampm:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm.lower() == "pm" else 0)
+    try:
+        return datetime(int(year), int(month), int(day), hour, minute)
+    except ValueError:
+        return None
+
+
+def canonical_datetime(value):
+    """The stored form of a datetime value ("" stays ""), or None if it cannot be parsed."""
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip()
+    if not text:
+        return ""
+    parsed = parse_datetime(text)
+    if parsed is None:
+        return None
+    return parsed.strftime(DATETIME_FORMAT if " " in text else DATE_FORMAT)
+
+
+def preview(text):
+    """One-line start of a description for tables ("..." when cut)."""
+    if not isinstance(text, str):
+        return "" if text is None else str(text)
+    if len(text) <= PREVIEW_CHARS and "\n" not in text:
+        return text             # stored text is already trimmed
+    short = " ".join(text[:PREVIEW_SOURCE_CHARS].split())
+    if len(short) <= PREVIEW_CHARS and len(text) <= PREVIEW_SOURCE_CHARS:
+        return short
+    return short[:PREVIEW_CHARS - 3].rstrip() + "..."
+
+
+# ======================
+# SINGLE RECORD (WRITE)
+# ======================
+def clean_record(kind, data, partial=False):
+    """Validated, normalized copy of `data` for a "main" or "wellness" record.
+
+    With partial=True only the fields present are checked (updates that
+    change a few fields). Raises ValidationError with a message for the user.
+    """
+    if not partial:
+        missing = [f for f in REQUIRED[kind] if f not in data]
+        if missing:
+            raise ValidationError(f"Missing field(s): {', '.join(missing)}.")
+
+    cleaned = {}
+    for field, value in data.items():
+        if field in TEXT_FIELDS[kind]:
+            value = "" if value is None else str(value).strip()
+            if field == "label" and not value:
+                raise ValidationError("Label must not be empty.")
+
+        elif field in ENUM_FIELDS[kind]:
+            canonical = canonical_enum(field, value)
+            if canonical is None:
+                allowed = ", ".join(ENUM_FIELDS[kind][field])
+                raise ValidationError(f"{field.capitalize()} must be one of: {allowed}.")
+            value = canonical
+
+        elif field == "datetime":
+            canonical = canonical_datetime("" if value is None else value)
+            if canonical is None:
+                raise ValidationError(f"Date/Time must look like 2025-12-11 10:00 AM (got {value!r}).")
+            value = canonical
+
+        cleaned[field] = value
+    return cleaned
+
+
+# ======================
+# WHOLE FILES (LOAD)
+# ======================
+def _lenient_enum(field):
+    def clean(value):
+        canonical = canonical_enum(field, value)
+        if canonical is not None:
+            return canonical
+        return value.strip() if isinstance(value, str) else value
+    return clean
+
+
+def _lenient_datetime(value):
+    if isinstance(value, str) and CANONICAL_DATETIME_RE.fullmatch(value):
+        return value            # already in the stored form, skip the parse
+    canonical = canonical_datetime(value)
+    if canonical is not None:
+        return canonical
+    return value.strip() if isinstance(value, str) else value
+
+
+def _strip(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def clean_rows(kind, rows):
+    """Normalize a list of records in place, one column at a time.
+
+    Each distinct value of a column is cleaned once; only rows holding a
+    value that changed are written to. Values that cannot be normalized are
+    kept (trimmed). Returns how many records changed.
+    """
+    columns = [(f, _strip) for f in TEXT_FIELDS[kind]]
+    columns += [(f, _lenient_enum(f)) for f in ENUM_FIELDS[kind]]
+    columns.append(("datetime", _lenient_datetime))
+
+    changed = set()
+    for field, clean in columns:
+        values = [row.get(field) for row in rows]
+        try:
+            distinct = set(values)
+        except TypeError:           # unhashable values: clean row by row
+            fixes = {i: clean(v) for i, v in enumerate(values) if v is not None}
+            fixes = {i: new for i, new in fixes.items() if new != values[i]}
+        else:
+            mapping = {v: clean(v) for v in distinct if v is not None}
+            dirty = {v: new for v, new in mapping.items() if new != v}
+            fixes = {i: dirty[v] for i, v in enumerate(values) if v in dirty} if dirty else {}
+
+        for i, new in fixes.items():
+            rows[i][field] = new
+        changed.update(fixes)
+    return len(changed)
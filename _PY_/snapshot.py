@@ -0,0 +1,451 @@
+# ==============================
+# BINARY SNAPSHOT STORE (.hhs)
+# ==============================
+# A compact alternative to the indent=4 JSON files.
+#
+#   header  : magic, kind, row count, heap offset, highest id
+#   rows    : fixed-width columns -> id, type code, severity/frequency code,
+#             version, timestamp, and (offset, length) refs for label,
+#             description, datetime and an "extra" blob
+#   heap    : UTF-8 strings referenced by the rows: first the short ones
+#             (labels, datetimes), then descriptions and extra blobs
+#
+# Files are opened with mmap. Loading only maps the file; row proxies are
+# created as rows are touched and strings are decoded when a row is
+# displayed or edited. Tables only read the first bytes of a description
+# (LazyRecord.description_preview()); the full text is decoded when a form
+# opens the record.
+# Rows that do not fit the fixed schema (unknown enum text, extra keys,
+# unusual value types) keep their full JSON in the extra blob, which keeps
+# the JSON <-> snapshot round trip lossless.
+import calendar
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import MutableMapping, MutableSequence
+from functools import lru_cache
+
+from schema import (CATEGORIES, FREQUENCIES, MAIN_TYPES, PREVIEW_SOURCE_CHARS, SEVERITIES,
+                    parse_datetime, preview)
+
+MAGIC = b"HHSNAP01"
+HEADER = struct.Struct("<8sBxxxIQq")          # magic, kind, rows, heap offset, max id
+ROW = struct.Struct("<qBBHq8I")              # id, type, level, version, ts, 4 x (off, len)
+MAX_VERSION = 0xFFFF                         # version 0 means the record has no "version" key
+LONG_REF_FIELDS = (7, 11)                    # description and extra offsets (row tuple index)
+LONG_REF_POSITIONS = tuple(struct.calcsize("<qBBHq") + 4 * (i - 5) for i in LONG_REF_FIELDS)
+PREVIEW_BYTES = 4 * (PREVIEW_SOURCE_CHARS + 1)   # enough UTF-8 for preview() to see the cut
+
+KINDS = ("main", "wellness")
+MAIN_KEYS = ("label", "type", "description", "datetime", "severity", "id")
+WELLNESS_KEYS = ("label", "category", "frequency", "description", "datetime", "id")
+
+# Enum codes index the tables in schema.py; code 0 is "not in the table".
+# kind -> (record keys, type field, type table, level field, level table)
+SCHEMAS = {
+    "main": (MAIN_KEYS, "type", MAIN_TYPES, "severity", SEVERITIES),
+    "wellness": (WELLNESS_KEYS, "category", CATEGORIES, "frequency", FREQUENCIES),
+}
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(text):
+    """Seconds since the epoch for a record datetime string, or -1.
+
+    Accepts "2025-12-11 10:00 AM", "2025-12-11 22:00" and "2025-12-11".
+    """
+    parsed = parse_datetime(text)
+    if parsed is None:
+        return -1
+    return calendar.timegm(parsed.timetuple())
+
+
+# ======================
+# WRITING
+# ======================
+def _fits_schema(rec, keys, type_field, types, level_field, levels):
+    rec_keys = tuple(rec.keys())
+    if rec_keys == keys + ("version",):
+        version = rec["version"]
+        if type(version) is not int or not 0 < version <= MAX_VERSION:
+            return False
+    elif rec_keys != keys:
+        return False
+    if type(rec["id"]) is not int:
+        return False
+    if rec[type_field] not in types or rec[level_field] not in levels:
+        return False
+    return all(type(rec[k]) is str for k in ("label", "description", "datetime"))
+
+
+def encode_rows(rows, kind):
+    """Return the snapshot bytes for a list of record mappings."""
+    keys, type_field, types, level_field, levels = SCHEMAS[kind]
+    type_codes = {name: i + 1 for i, name in enumerate(types)}
+    level_codes = {name: i + 1 for i, name in enumerate(levels)}
+
+    heap = bytearray()          # short strings
+    long_heap = bytearray()     # descriptions and extra blobs, stored after `heap`
+
+    def writer(buffer):
+        def put(text):
+            if not text:
+                return 0, 0
+            data = text.encode("utf-8") if isinstance(text, str) else text
+            offset = len(buffer)
+            buffer.extend(data)
+            return offset, len(data)
+        return put
+
+    put, put_long = writer(heap), writer(long_heap)
+    table = bytearray(ROW.size * len(rows))
+    max_id = 0
+    for i, rec in enumerate(rows):
+        if isinstance(rec, LazyRecord) and rec.is_clean():
+            # Copy untouched rows straight from the old file.
+            max_id = max(max_id, rec.copy_into(table, i * ROW.size, put, put_long))
+            continue
+
+        if type(rec) is not dict:
+            rec = dict(rec)
+        max_id = max(max_id, _int_id(rec.get("id")))
+        if _fits_schema(rec, keys, type_field, types, level_field, levels):
+            extra = (0, 0)
+            row_id = rec["id"]
+            version = rec.get("version", 0)
+            strings = (rec["label"], rec["description"], rec["datetime"])
+        else:
+            extra = put_long(json.dumps(rec))
+            row_id = rec["id"] if type(rec.get("id")) is int else 0
+            version = 0
+            strings = ("", "", "")
+
+        dt = rec.get("datetime")
+        ROW.pack_into(
+            table, i * ROW.size,
+            row_id,
+            type_codes.get(rec.get(type_field), 0),
+            level_codes.get(rec.get(level_field), 0),
+            version,
+            parse_timestamp(dt) if isinstance(dt, str) else -1,
+            *put(strings[0]), *put_long(strings[1]), *put(strings[2]), *extra,
+        )
+
+    if heap:
+        table = _shift_long_refs(table, len(heap))
+    header = HEADER.pack(MAGIC, KINDS.index(kind), len(rows), HEADER.size + len(table), max_id)
+    return header + bytes(table) + bytes(heap) + bytes(long_heap)
+
+
+def _shift_long_refs(table, shift):
+    """Add `shift` to every description/extra offset, one column at a time.
+
+    Long strings are numbered from the start of their own buffer, which is
+    written after the short strings. Empty refs are shifted too; readers
+    ignore the offset of an empty string.
+    """
+    words = array("I")
+    words.frombytes(table)
+    if sys.byteorder == "big":
+        words.byteswap()
+    per_row = ROW.size // 4
+    for pos in LONG_REF_POSITIONS:
+        column = words[pos // 4::per_row]
+        words[pos // 4::per_row] = array("I", [offset + shift for offset in column])
+    if sys.byteorder == "big":
+        words.byteswap()
+    return words.tobytes()
+
+
+def _int_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def write_snapshot(path, rows, kind):
+    """Atomically replace `path` with a snapshot of `rows`."""
+    data = encode_rows(rows, kind)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+
+    try:
+        os.replace(tmp, path)
+    except PermissionError:
+        # Windows will not replace a file that is still mapped.
+        for rec in rows:
+            if isinstance(rec, LazyRecord):
+                rec.materialize()
+        close_reader(path)
+        os.replace(tmp, path)
+
+
+# ======================
+# READING
+# ======================
+_readers = {}
+
+
+class SnapshotReader:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a HealthHub snapshot")
+
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, kind_code, self.count, self.heap_offset, self.max_id = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a HealthHub snapshot")
+
+        self.kind = KINDS[kind_code]
+        (self.keys, self.type_field, self.types,
+         self.level_field, self.levels) = SCHEMAS[self.kind]
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def raw_row(self, index):
+        return ROW.unpack_from(self._map, HEADER.size + index * ROW.size)
+
+    def heap_bytes(self, offset, length):
+        start = self.heap_offset + offset
+        return self._map[start:start + length]
+
+    def text(self, offset, length):
+        if not length:
+            return ""
+        return self.heap_bytes(offset, length).decode("utf-8")
+
+    def text_prefix(self, offset, length, limit):
+        """At most `limit` bytes of a string, decoded (a cut character is dropped)."""
+        return self.heap_bytes(offset, min(length, limit)).decode("utf-8", "ignore")
+
+    def records(self):
+        return SnapshotRows(self)
+
+
+def open_reader(path):
+    # Older readers for the same path stay mapped until their rows are gone.
+    reader = _readers[path] = SnapshotReader(path)
+    return reader
+
+
+def close_reader(path):
+    reader = _readers.pop(path, None)
+    if reader is not None:
+        reader.close()
+
+
+def load_records(path):
+    """Map a snapshot file and return its rows as a SnapshotRows list."""
+    return open_reader(path).records()
+
+
+class LazyRecord(MutableMapping):
+    """A record dict backed by one snapshot row.
+
+    `id` and the enum columns come from the fixed-width row; text fields are
+    decoded on first access. Any write turns the row into a plain dict.
+    """
+
+    __slots__ = ("_reader", "_index", "_data")
+
+    def __init__(self, reader, index):
+        self._reader = reader
+        self._index = index
+        self._data = None
+
+    def is_clean(self):
+        return self._data is None
+
+    def materialize(self):
+        if self._data is None:
+            self._data = self._decode()
+            self._reader = None
+        return self._data
+
+    def _decode(self):
+        r = self._reader
+        row_id, type_code, level_code, version, _ts, *refs = r.raw_row(self._index)
+        if refs[7]:
+            return json.loads(r.text(refs[6], refs[7]))
+
+        label, description, dt = (r.text(refs[0], refs[1]), r.text(refs[2], refs[3]),
+                                  r.text(refs[4], refs[5]))
+        values = {
+            "label": label,
+            "description": description,
+            "datetime": dt,
+            "id": row_id,
+            r.type_field: r.types[type_code - 1],
+            r.level_field: r.levels[level_code - 1],
+        }
+        decoded = {k: values[k] for k in r.keys}
+        if version:
+            decoded["version"] = version
+        return decoded
+
+    def timestamp(self):
+        """Parsed datetime (epoch seconds) without decoding any text."""
+        if self._data is not None:
+            dt = self._data.get("datetime")
+            return parse_timestamp(dt) if isinstance(dt, str) else -1
+        return self._reader.raw_row(self._index)[4]
+
+    def description_preview(self):
+        """schema.preview() of the description, decoding only its first bytes."""
+        if self._data is not None:
+            return preview(self._data.get("description"))
+        r = self._reader
+        row = r.raw_row(self._index)
+        if row[12]:
+            return preview(self.materialize().get("description"))
+        return preview(r.text_prefix(row[7], row[8], PREVIEW_BYTES))
+
+    def copy_into(self, table, offset, put, put_long):
+        """Re-pack this row into a new table; returns its id."""
+        r = self._reader
+        row = list(r.raw_row(self._index))
+        for slot, store in ((5, put), (7, put_long), (9, put), (11, put_long)):
+            if row[slot + 1]:
+                row[slot], row[slot + 1] = store(r.heap_bytes(row[slot], row[slot + 1]))
+            else:
+                row[slot] = 0
+        ROW.pack_into(table, offset, *row)
+        if row[12]:
+            return _int_id(self.materialize().get("id"))
+        return row[0]
+
+    # ---- mapping protocol ----
+    def __getitem__(self, key):
+        if self._data is not None:
+            return self._data[key]
+
+        r = self._reader
+        row = r.raw_row(self._index)
+        if row[12]:
+            return self.materialize()[key]
+
+        if key == "id":
+            return row[0]
+        if key == r.type_field:
+            return r.types[row[1] - 1]
+        if key == r.level_field:
+            return r.levels[row[2] - 1]
+        if key == "label":
+            return r.text(row[5], row[6])
+        if key == "description":
+            return r.text(row[7], row[8])
+        if key == "datetime":
+            return r.text(row[9], row[10])
+        if key == "version" and row[3]:
+            return row[3]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self.materialize()[key]
+
+    def __iter__(self):
+        if self._data is not None:
+            return iter(self._data)
+        row = self._reader.raw_row(self._index)
+        if row[12]:
+            return iter(self.materialize())
+        if row[3]:
+            return iter(self._reader.keys + ("version",))
+        return iter(self._reader.keys)
+
+    def __len__(self):
+        if self._data is not None:
+            return len(self._data)
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"LazyRecord({dict(self)!r})"
+
+
+class SnapshotRows(MutableSequence):
+    """The record list for one snapshot file.
+
+    Slots hold a row number until the row is first touched, then its
+    LazyRecord; appended records are stored as-is. Opening a file with a
+    million rows therefore costs one small list, not a million objects.
+    """
+
+    def __init__(self, reader):
+        self._reader = reader
+        self._items = list(range(reader.count))
+        self.max_id = reader.max_id   # highest id at load time
+
+    def _row(self, i):
+        item = self._items[i]
+        if type(item) is int:
+            item = self._items[i] = LazyRecord(self._reader, item)
+        return item
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self._items)))]
+        return self._row(i)
+
+    def __setitem__(self, i, value):
+        self._items[i] = value
+
+    def __delitem__(self, i):
+        del self._items[i]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self._row(i)
+
+    def insert(self, i, value):
+        self._items.insert(i, value)
+
+
+# ======================
+# JSON CONVERSION
+# ======================
+def json_to_snapshot(json_path, snapshot_path, kind):
+    with open(json_path, "r") as f:
+        rows = json.load(f)
+    write_snapshot(snapshot_path, rows, kind)
+
+
+def snapshot_to_json(snapshot_path, json_path):
+    reader = SnapshotReader(snapshot_path)
+    try:
+        rows = [dict(r) for r in reader.records()]
+    finally:
+        reader.close()
+    with open(json_path, "w") as f:
+        json.dump(rows, f, indent=4)
+
+
+if __name__ == "__main__":
+    # python snapshot.py to-json  healthhub_records.hhs  healthhub_records.json
+    # python snapshot.py to-snapshot healthhub_records.json healthhub_records.hhs main
+    if len(sys.argv) >= 4 and sys.argv[1] == "to-json":
+        snapshot_to_json(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) >= 5 and sys.argv[1] == "to-snapshot":
+        json_to_snapshot(sys.argv[2], sys.argv[3], sys.argv[4])
+    else:
+        sys.exit("usage: snapshot.py to-json SRC DST | to-snapshot SRC DST main|wellness")
@@ -0,0 +1,462 @@
+# ===================================
+# OFFLINE-FIRST SYNC (LOCAL <-> MYSQL)
+# ===================================
+# The local store stays the source of truth for the UI. Every local change
+# is written to an outbox; push() sends it to MySQL in batches and pull()
+# fetches remote changes newer than a per-table high-water mark.
+#
+# Records are matched across stores by a `uid` (local ids and MySQL
+# AUTO_INCREMENT ids are independent). Every change carries a version
+# (client timestamp, origin id). The higher version wins, and ties go to
+# the larger origin, so every workstation resolves a conflict the same way.
+#
+# The synced tables need a few extra columns, see ensure_schema(). Deletes
+# are pushed as tombstones (deleted = 1) so other workstations can pull them.
+#
+# Data that existed before sync was turned on is reconciled too. seed()
+# puts every local record in the outbox once, and before each push
+# reconcile() gives remote rows without a uid (written before the sync
+# columns existed, or by an older HealthHub) a uid and a sync_version so
+# pull() brings them down. A seeded record with the same contents as such a
+# row takes it over instead of being pushed as a second copy.
+#
+# State lives in two files: <state_path> (origin, high-water marks, uid map)
+# is rewritten after each push/pull, while every local change is appended to
+# <state_path>.outbox as one JSON line, so recording a change stays O(1).
+#
+# The engine keeps that state in memory, so only one process may own a
+# state file. Other HealthHub windows on the same store hand their changes
+# over with queue_change(); the owner moves them into its outbox with
+# take_queued().
+import json
+import os
+import threading
+import time
+import uuid
+from itertools import islice
+
+import schema
+
+FIELDS = {
+    "main": ("label", "type", "description", "datetime", "severity"),
+    "wellness": ("label", "category", "frequency", "description", "datetime"),
+}
+TABLES = {"main": "main_records", "wellness": "wellness_records"}
+
+MIGRATION = (
+    "ALTER TABLE {t} ADD COLUMN uid VARCHAR(36)",
+    "ALTER TABLE {t} ADD COLUMN version_ts DOUBLE NOT NULL DEFAULT 0",
+    "ALTER TABLE {t} ADD COLUMN origin VARCHAR(64) NOT NULL DEFAULT ''",
+    "ALTER TABLE {t} ADD COLUMN sync_version BIGINT NOT NULL DEFAULT 0",
+    "ALTER TABLE {t} ADD COLUMN deleted SMALLINT NOT NULL DEFAULT 0",
+    "CREATE UNIQUE INDEX {t}_uid ON {t} (uid)",
+    "CREATE INDEX {t}_sync_version ON {t} (sync_version)",
+)
+
+
+def ensure_schema(connect):
+    """Add the sync columns and indexes. Safe to run more than once."""
+    conn = connect()
+    try:
+        for table in TABLES.values():
+            for statement in MIGRATION:
+                cur = conn.cursor()
+                try:
+                    cur.execute(statement.format(t=table))
+                except Exception:
+                    # Column or index already exists; the driver-specific
+                    # error types (mysql.connector / sqlite3) differ.
+                    pass
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def queue_change(path, source, op, record):
+    """Append a local change for the window that syncs (see SyncEngine.take_queued())."""
+    entry = {"source": source, "op": op, "at": time.time(),
+             "record": {"id": record["id"], **{f: record.get(f) for f in FIELDS[source]}}}
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def _contents(source, data):
+    """Synced fields of a record or row, normalized like the store and compared as text."""
+    row = {f: data.get(f) for f in FIELDS[source]}
+    schema.clean_rows(source, [row])
+    return tuple("" if row[f] is None else str(row[f]) for f in FIELDS[source])
+
+
+class SyncEngine:
+    def __init__(self, connect, state_path, dialect="mysql", batch_size=200):
+        self.connect = connect
+        self.state_path = state_path
+        self.batch_size = batch_size
+        # Row locks so two workstations never hand out the same sync_version.
+        self.lock_clause = " FOR UPDATE" if dialect == "mysql" else ""
+
+        self.outbox_path = state_path + ".outbox"
+        self._lock = threading.Lock()
+        self._applying = False              # set while apply() writes to the local store
+        self._schema_checked = False        # ensure_schema() ran in this process
+        self.state = self._load_state()
+        self.outbox = {}                    # uid -> latest pending entry
+        self._keys = {uid: key for key, uid in self.state["uids"].items()}
+        self._replay_outbox()
+
+    # ------------------------------------------------
+    # STATE FILE
+    # ------------------------------------------------
+    def _load_state(self):
+        state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+
+        state.setdefault("origin", uuid.uuid4().hex)
+        state.setdefault("seq", 0)
+        state.setdefault("high_water", {"main": 0, "wellness": 0})
+        state.setdefault("uids", {})        # "main:<local id>" -> uid
+        state.setdefault("versions", {})    # uid -> [timestamp, origin]
+        state.setdefault("seeded", False)   # local store put in the outbox once
+        return state
+
+    def _replay_outbox(self):
+        if not os.path.exists(self.outbox_path):
+            return
+        with open(self.outbox_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    self._remember(json.loads(line))
+
+    def _remember(self, entry):
+        """Fold one outbox entry into the in-memory state."""
+        uid, key = entry["uid"], entry["key"]
+        self.outbox.pop(uid, None)          # only the latest state is pushed
+        self.outbox[uid] = entry
+        self.state["versions"][uid] = entry["version"]
+        self.state["seq"] = max(self.state["seq"], entry["seq"])
+        if entry["deleted"]:
+            self.state["uids"].pop(key, None)
+            self._keys.pop(uid, None)
+        else:
+            self.state["uids"][key] = uid
+            self._keys[uid] = key
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+        # Compact the outbox log down to what is still pending.
+        tmp = self.outbox_path + ".tmp"
+        with open(tmp, "w") as f:
+            for entry in self.outbox.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.outbox_path)
+
+    @property
+    def origin(self):
+        return self.state["origin"]
+
+    @property
+    def seeded(self):
+        return self.state["seeded"]
+
+    def pending(self):
+        with self._lock:
+            return len(self.outbox)
+
+    # ------------------------------------------------
+    # LOCAL CHANGES -> OUTBOX
+    # ------------------------------------------------
+    def record_change(self, source, op, record, at=None):
+        """Change listener for the local data layer (insert/update/delete).
+
+        `at` is when the change was made, if not now (queued changes).
+        """
+        if self._applying:
+            return      # our own apply() writing pulled rows; do not push them back
+        with self._lock:
+            entry = self._entry(source, op, record, at)
+            if entry is None:
+                return
+            self._remember(entry)
+            with open(self.outbox_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def take_queued(self, path):
+        """Move changes queued with queue_change() into the outbox. Returns how many.
+
+        Call it under the lock the changes were queued under.
+        """
+        try:
+            with open(path, "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        for line in lines:
+            if line.strip():
+                e = json.loads(line)
+                self.record_change(e["source"], e["op"], e["record"], at=e["at"])
+        os.remove(path)
+        return len(lines)
+
+    def seed(self, local_rows):
+        """Put every record of {"main": rows, "wellness": rows} in the outbox.
+
+        Only the first call does anything, so records that were in the local
+        store before sync was turned on are pushed too. Call it with the
+        store as loaded, before the first exchange().
+        """
+        with self._lock:
+            if self.state["seeded"]:
+                return
+            for source, rows in local_rows.items():
+                for record in rows:
+                    if f"{source}:{record['id']}" not in self.state["uids"]:
+                        entry = self._entry(source, "insert", record)
+                        entry["seed"] = True
+                        self._remember(entry)
+            self.state["seeded"] = True
+            self._save_state()
+
+    def _entry(self, source, op, record, at=None):
+        """Outbox entry for a local change, or None for a delete of a record never synced."""
+        key = f"{source}:{record['id']}"
+        uid = self.state["uids"].get(key)
+        if uid is None:
+            if op == "delete":
+                return None
+            uid = uuid.uuid4().hex
+        return {
+            "seq": self.state["seq"] + 1,
+            "source": source,
+            "key": key,
+            "uid": uid,
+            "version": [time.time() if at is None else at, self.origin],
+            "deleted": op == "delete",
+            "data": None if op == "delete" else {f: record.get(f) for f in FIELDS[source]},
+        }
+
+    # ------------------------------------------------
+    # NETWORK (safe to run off the Tk thread)
+    # ------------------------------------------------
+    def exchange(self):
+        """Adopt remote rows, push the outbox, then pull remote changes. Returns the pulled rows.
+
+        The first exchange in a process runs ensure_schema() first, so a
+        database that was never migrated gets the sync columns.
+        """
+        if not self._schema_checked:
+            ensure_schema(self.connect)
+            self._schema_checked = True
+        self.reconcile()
+        self.push()
+        return self.pull()
+
+    def reconcile(self):
+        """Give remote rows without a uid one. Returns how many were adopted.
+
+        A row with the same contents as a seeded record that was not pushed
+        yet takes over that record's uid and version, and the seed entry is
+        dropped from the outbox. Every other row gets a new uid; pull() then
+        brings it down like any remote insert.
+        """
+        with self._lock:
+            pending = [e for e in self.outbox.values() if e.get("seed")]
+        seeds = {}
+        for e in pending:
+            seeds.setdefault((e["source"], _contents(e["source"], e["data"])), []).append(e)
+
+        matched, adopted = [], 0
+        conn = self.connect()
+        try:
+            cur = conn.cursor(dictionary=True)
+            for source, table in TABLES.items():
+                adopted += self._adopt_table(cur, source, table, seeds, matched)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if matched:
+            with self._lock:
+                for e in matched:
+                    # A newer local change keeps its entry; push() updates the row.
+                    if self.outbox.get(e["uid"]) is e:
+                        del self.outbox[e["uid"]]
+                self._save_state()
+        return adopted
+
+    def _adopt_table(self, cur, source, table, seeds, matched):
+        cur.execute(f"SELECT * FROM {table} WHERE uid IS NULL AND deleted = 0{self.lock_clause}")
+        rows = cur.fetchall()
+        if not rows:
+            return 0
+
+        sync_version = self._max_sync_version(cur, table)
+        now = time.time()
+        stamps = []
+        for row in rows:
+            sync_version += 1
+            same = seeds.get((source, _contents(source, row)))
+            if same:
+                e = same.pop()
+                matched.append(e)
+                stamps.append((e["uid"], e["version"][0], e["version"][1], sync_version, row["id"]))
+            else:
+                stamps.append((uuid.uuid4().hex, now, self.origin, sync_version, row["id"]))
+        cur.executemany(
+            f"UPDATE {table} SET uid=%s, version_ts=%s, origin=%s, sync_version=%s "
+            f"WHERE id=%s AND uid IS NULL", stamps)
+        return len(stamps)
+
+    def _max_sync_version(self, cur, table):
+        cur.execute(f"SELECT MAX(sync_version) AS v FROM {table}{self.lock_clause}")
+        row = cur.fetchone()
+        return (row["v"] if row else None) or 0
+
+    def push(self):
+        """Send one batch of outbox entries. Returns how many were sent."""
+        with self._lock:
+            batch = list(islice(self.outbox.values(), self.batch_size))
+        if not batch:
+            return 0
+
+        conn = self.connect()
+        try:
+            cur = conn.cursor(dictionary=True)
+            for source, table in TABLES.items():
+                entries = [e for e in batch if e["source"] == source]
+                if entries:
+                    self._push_table(cur, table, FIELDS[source], entries)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        with self._lock:
+            for e in batch:
+                # Keep entries that were replaced by a newer change meanwhile.
+                if self.outbox.get(e["uid"]) is e:
+                    del self.outbox[e["uid"]]
+            self._save_state()
+        return len(batch)
+
+    def _push_table(self, cur, table, fields, entries):
+        sync_version = self._max_sync_version(cur, table)
+
+        marks = ", ".join(["%s"] * len(entries))
+        cur.execute(f"SELECT uid, version_ts, origin FROM {table} WHERE uid IN ({marks}){self.lock_clause}",
+                    [e["uid"] for e in entries])
+        remote = {r["uid"]: (r["version_ts"], r["origin"]) for r in cur.fetchall()}
+
+        inserts, updates, tombstones = [], [], []
+        for e in entries:
+            theirs = remote.get(e["uid"])
+            if theirs is not None and tuple(theirs) >= tuple(e["version"]):
+                continue        # remote copy is newer; pull() brings it down
+            if e["deleted"] and theirs is None:
+                continue        # created and deleted before it was ever pushed
+
+            sync_version += 1
+            stamp = (e["version"][0], e["version"][1], sync_version)
+            if e["deleted"]:
+                tombstones.append(stamp + (e["uid"],))
+            elif theirs is None:
+                inserts.append(tuple(e["data"][f] for f in fields) + stamp + (e["uid"],))
+            else:
+                updates.append(tuple(e["data"][f] for f in fields) + stamp + (e["uid"],))
+
+        columns = ", ".join(fields)
+        if inserts:
+            marks = ", ".join(["%s"] * (len(fields) + 4))
+            cur.executemany(
+                f"INSERT INTO {table} ({columns}, version_ts, origin, sync_version, uid) VALUES ({marks})",
+                inserts)
+        if updates:
+            assignments = ", ".join(f"{f}=%s" for f in fields)
+            cur.executemany(
+                f"UPDATE {table} SET {assignments}, deleted=0, version_ts=%s, origin=%s, sync_version=%s "
+                f"WHERE uid=%s", updates)
+        if tombstones:
+            cur.executemany(
+                f"UPDATE {table} SET deleted=1, version_ts=%s, origin=%s, sync_version=%s WHERE uid=%s",
+                tombstones)
+
+    def pull(self):
+        """Fetch rows changed since the last applied high-water mark."""
+        with self._lock:
+            high_water = dict(self.state["high_water"])
+
+        changes = []
+        conn = self.connect()
+        try:
+            cur = conn.cursor(dictionary=True)
+            for source, table in TABLES.items():
+                cur.execute(f"SELECT * FROM {table} WHERE sync_version > %s "
+                            f"ORDER BY sync_version LIMIT {int(self.batch_size)}",
+                            (high_water[source],))
+                changes.extend((source, row) for row in cur.fetchall())
+        finally:
+            conn.close()
+        return changes
+
+    # ------------------------------------------------
+    # REMOTE CHANGES -> LOCAL STORE (Tk thread)
+    # ------------------------------------------------
+    def apply(self, changes, store):
+        """Apply pulled rows through store(source, op, local_id, data).
+
+        `store` upserts (op "upsert", returning the local id, allocating one
+        when local_id is None) or deletes (op "delete") a local record.
+        Changes it reports to record_change() meanwhile are ignored, so they
+        do not re-enter the outbox. Returns how many rows changed.
+        """
+        applied = 0
+        with self._lock:
+            self._applying = True
+            try:
+                applied = self._apply(changes, store)
+            finally:
+                self._applying = False
+            self._save_state()
+        return applied
+
+    def _apply(self, changes, store):
+        applied = 0
+        state = self.state
+        for source, row in changes:
+            state["high_water"][source] = max(state["high_water"][source], row["sync_version"])
+
+            uid = row.get("uid")
+            if not uid:
+                continue
+            theirs = (row["version_ts"], row["origin"])
+            mine = state["versions"].get(uid)
+            if mine is not None and tuple(mine) >= theirs:
+                continue    # our own push echoing back, or local is newer
+
+            self.outbox.pop(uid, None)
+            state["versions"][uid] = list(theirs)
+            key = self._keys.get(uid)
+            local_id = int(key.split(":")[1]) if key else None
+
+            if row["deleted"]:
+                if key:
+                    store(source, "delete", local_id, None)
+                    del state["uids"][key]
+                    del self._keys[uid]
+            else:
+                local_id = store(source, "upsert", local_id, {f: row[f] for f in FIELDS[source]})
+                key = f"{source}:{local_id}"
+                state["uids"][key] = uid
+                self._keys[uid] = key
+            applied += 1
+        return applied
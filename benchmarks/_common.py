@@ -0,0 +1,122 @@
+# ===========================
+# SHARED BENCHMARK HELPERS
+# ===========================
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# HEALTHHUB_BENCH_PY_DIR points the suites at another checkout's _PY_ folder,
+# e.g. to run the startup suite against a revision without benchmarks.
+PY_DIR = os.environ.get("HEALTHHUB_BENCH_PY_DIR") or os.path.join(ROOT, "_PY_")
+DB_DIR = os.path.join(PY_DIR, "DB")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# main.py and database.py are plain scripts, so make their folders importable.
+for path in (PY_DIR, DB_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+DEFAULT_SIZES = "1k,100k,1M"
+
+
+def parse_sizes(text):
+    """Turn "1k,100k,1M" into [1000, 100000, 1000000]."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        factor = 1
+        if part.endswith("k"):
+            factor, part = 1000, part[:-1]
+        elif part.endswith("m"):
+            factor, part = 1000000, part[:-1]
+        sizes.append(int(float(part) * factor))
+    return sizes
+
+
+def measure(fn, repeat=5, setup=None):
+    """Run fn() `repeat` times and return timing stats in seconds."""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+
+    return {
+        "runs": len(runs),
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "max": max(runs),
+    }
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(results, output=None, label=None):
+    """Write results plus run metadata as JSON and return the file path."""
+    revision = git_revision()
+    label = label or revision
+    payload = {
+        "label": label,
+        "revision": revision,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{label}.json")
+
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=4)
+    return output
+
+
+# ======================
+# HEADLESS DISPLAY
+# ======================
+_xvfb = None
+
+
+def ensure_display():
+    """Start an Xvfb server when no display is available (Linux only)."""
+    global _xvfb
+
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("No DISPLAY and Xvfb is not installed; run under xvfb-run.")
+
+    display = ":99"
+    _xvfb = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x800x24"],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5)
+
+
+def stop_display():
+    global _xvfb
+    if _xvfb is not None:
+        _xvfb.terminate()
+        _xvfb.wait()
+        _xvfb = None
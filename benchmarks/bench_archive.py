@@ -0,0 +1,66 @@
+# ===========================
+# ARCHIVE BENCHMARKS
+# ===========================
+# Times the store before and after moving old records to the archive
+# (_PY_/archive.py) at n rows: loading and listing the full history, the
+# archive pass itself, loading and listing only the recent records,
+# searching the archive and restoring a record from it. The generated
+# records span six years; the last one stays in the store. Only main
+# records are archived; wellness habits always stay.
+import tempfile
+from datetime import datetime, timedelta
+
+from _common import measure
+import datagen
+from bench_data_layer import _point_at
+
+KEEP_FROM = datagen.START + timedelta(days=5 * 365)
+
+
+def bench_size(n, repeat=3):
+    import main
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        datagen.write_store(tmp, n // 2, n - n // 2)
+        _point_at(main, tmp)
+        main.STORE_FORMAT = "json"
+        main.records, main.wellness_records = [], []
+
+        results["load_all_data[full history]"] = measure(main.load_all_data, repeat)
+        results["fetch_all_records[full history]"] = measure(
+            main.fetch_all_records, repeat, setup=main.cache.clear)
+        total = len(main.records) + len(main.wellness_records)
+        habits = len(main.wellness_records)
+
+        days = (datetime.now() - KEEP_FROM).days
+        moved = []
+        results["archive_old_records"] = measure(lambda: moved.append(main.archive_old_records(days)), 1)
+        if moved[0] + len(main.records) + len(main.wellness_records) != total:
+            raise AssertionError("records were lost while archiving")
+        if len(main.wellness_records) != habits:
+            raise AssertionError("wellness habits were archived")
+
+        results["load_all_data[recent]"] = measure(main.load_all_data, repeat)
+        results["fetch_all_records[recent]"] = measure(
+            main.fetch_all_records, repeat, setup=main.cache.clear)
+
+        exclude = main.store_keys()
+        results["search_archive[text]"] = measure(
+            lambda: main.search_archive("headache", exclude=exclude), repeat)
+        results["search_archive[all]"] = measure(
+            lambda: main.search_archive(exclude=exclude), repeat)
+        if len(main.search_archive(exclude=exclude)) != moved[0]:
+            raise AssertionError("the archive search did not return every archived record")
+
+        source, row = main.search_archive(exclude=exclude)[0]
+        results["restore_archived"] = measure(lambda: main.restore_archived(source, row), 1)
+        main.delete_record_db(row["id"])
+        if any(r["id"] == row["id"] for _s, r in main.search_archive(exclude=main.store_keys())):
+            raise AssertionError("a restored and deleted record came back in the archive search")
+
+    return results
+
+
+def run(sizes, repeat=3):
+    return {str(n): bench_size(n, repeat) for n in sizes}
@@ -0,0 +1,56 @@
+# ===========================
+# BACKUP BENCHMARKS
+# ===========================
+# Times the parts of _PY_/backup.py at n rows: collecting changes on the Tk
+# thread, writing a changes segment and a base (background thread), and
+# restoring to a point in time. Also checks the restored rows are right.
+import os
+import tempfile
+import time
+
+from _common import measure
+import datagen
+from bench_data_layer import _point_at
+
+CHANGES = 1000
+
+
+def bench_size(n, repeat=3):
+    import backup
+    import main
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        datagen.write_store(tmp, n // 2, n - n // 2)
+        _point_at(main, tmp)
+        main.STORE_FORMAT = "json"
+        main.load_all_data()
+
+        directory = os.path.join(tmp, "backups")
+        manager = backup.BackupManager(directory, main.read_store_files)
+        results["write base"] = measure(manager._write_base, repeat)
+
+        sample = dict(main.records[0])
+
+        def collect():
+            for i in range(CHANGES):
+                manager.record_change("main", "update", dict(sample, version=i + 2))
+
+        results[f"record_change x{CHANGES}"] = measure(collect, repeat, setup=manager.pending.clear)
+        results[f"write changes x{CHANGES}"] = measure(manager._write, repeat, setup=collect)
+
+        point = time.time()
+        results["restore_rows"] = measure(lambda: backup.restore_rows(directory, point), repeat)
+        restored, _ids = backup.restore_rows(directory, point)
+        if len(restored["main"]) != len(main.records):
+            raise AssertionError("restore returned the wrong number of records")
+        if next(r for r in restored["main"] if r["id"] == sample["id"])["version"] != CHANGES + 1:
+            raise AssertionError("restore did not replay every change")
+
+        results["verify"] = measure(lambda: backup.verify(directory), repeat)
+
+    return results
+
+
+def run(sizes, repeat=3):
+    return {str(n): bench_size(n, repeat) for n in sizes}
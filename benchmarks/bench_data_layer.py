@@ -0,0 +1,122 @@
+# ===========================
+# JSON DATA LAYER BENCHMARKS
+# ===========================
+import json
+import os
+import tempfile
+
+from _common import measure
+import datagen
+
+
+def _point_at(main, directory):
+    main.MAIN_FILE = os.path.join(directory, "healthhub_records.json")
+    main.WELLNESS_FILE = os.path.join(directory, "healthhub_wellness.json")
+    main.MAIN_SNAPSHOT = os.path.join(directory, "healthhub_records.hhs")
+    main.WELLNESS_SNAPSHOT = os.path.join(directory, "healthhub_wellness.hhs")
+    main.LOCK_FILE = os.path.join(directory, "healthhub.lock")
+    main.ID_FILE = os.path.join(directory, "healthhub_ids.json")
+    main.ARCHIVE_DIR = os.path.join(directory, "healthhub_archive")
+
+
+# Rows the fixed snapshot layout cannot hold; they round-trip through the
+# extra blob (see _PY_/snapshot.py).
+ODD_ROWS = {
+    "main": [
+        {"label": "Flu shot", "type": "Vaccine", "description": "Unknown type.",
+         "datetime": "2025-03-01 09:00 AM", "severity": "Mild", "id": 900001},
+        {"id": 900002, "label": "Extra key", "type": "Symptoms", "description": "",
+         "datetime": "2025-03-01 09:00 AM", "severity": "Moderate", "note": {"by": "nurse"}},
+        {"label": "Busy record", "type": "Medicine", "description": "Edited often.",
+         "datetime": "2025-03-01 09:00 AM", "severity": "Critical", "id": 900003, "version": 0x10000},
+        {"label": "Imported", "type": "Appointment", "description": "Text id.",
+         "datetime": "2025-03-01 09:00 AM", "severity": "Mild", "id": "A-17"},
+    ],
+    "wellness": [
+        {"label": "Swim", "category": "Exercise", "frequency": "Monthly", "description": "Unknown frequency.",
+         "datetime": "2025-03-01 09:00 AM", "id": 900001},
+    ],
+}
+
+
+def check_snapshot_round_trip(directory, json_path, kind):
+    """Raise AssertionError unless JSON rows survive the snapshot format unchanged.
+
+    Values and key order are compared, including ODD_ROWS.
+    """
+    import snapshot
+
+    with open(json_path, "r") as f:
+        rows = json.load(f) + ODD_ROWS[kind]
+    path = os.path.join(directory, f"round_trip_{kind}.hhs")
+    snapshot.write_snapshot(path, rows, kind)
+    try:
+        loaded = [dict(r) for r in snapshot.load_records(path)]
+    finally:
+        snapshot.close_reader(path)
+    if [list(r.items()) for r in loaded] != [list(r.items()) for r in rows]:
+        raise AssertionError(f"{kind} rows changed in a JSON -> snapshot -> JSON round trip")
+
+
+def bench_size(n, repeat=3):
+    """Time load/save/fetch and every CRUD function against n rows in total."""
+    import main
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        main_file, wellness_file = datagen.write_store(tmp, n // 2, n - n // 2)
+        _point_at(main, tmp)
+        check_snapshot_round_trip(tmp, main_file, "main")
+        check_snapshot_round_trip(tmp, wellness_file, "wellness")
+
+        results["load_all_data"] = measure(main.load_all_data, repeat)
+        results["save_all_data"] = measure(main.save_all_data, repeat)
+        results["schema.clean_rows"] = measure(
+            lambda: main.schema.clean_rows("main", main.records), repeat)
+        results["fetch_all_records"] = measure(main.fetch_all_records, repeat, setup=main.cache.clear)
+        results["fetch_all_records[cached]"] = measure(main.fetch_all_records, repeat)
+        results["query_main_type"] = measure(
+            lambda: main.query_main_type("Symptoms"), repeat, setup=main.cache.clear)
+        results["query_main_type[cached]"] = measure(lambda: main.query_main_type("Symptoms"), repeat)
+        results["description_preview"] = measure(
+            lambda: [main.description_preview(r) for r in main.records], repeat)
+
+        main_row = datagen.make_main_records(1, seed=99)[0]
+        wellness_row = datagen.make_wellness_records(1, seed=99)[0]
+
+        def insert_main():
+            main.insert_record(dict(main_row))
+
+        def insert_wellness():
+            main.insert_wellness_record(dict(wellness_row))
+
+        results["insert_record"] = measure(insert_main, repeat)
+        results["update_record"] = measure(
+            lambda: main.update_record(main.next_id - 1, {"severity": "Critical"}), repeat)
+        results["delete_record_db"] = measure(
+            lambda: main.delete_record_db(main.next_id - 1), repeat, setup=insert_main)
+
+        results["insert_wellness_record"] = measure(insert_wellness, repeat)
+        results["update_wellness_record"] = measure(
+            lambda: main.update_wellness_record(main.next_wellness_id - 1, {"frequency": "Weekly"}),
+            repeat)
+        results["delete_wellness_record_db"] = measure(
+            lambda: main.delete_wellness_record_db(main.next_wellness_id - 1),
+            repeat, setup=insert_wellness)
+
+        # Same store in the binary snapshot format.
+        main.STORE_FORMAT = "snapshot"
+        try:
+            main.save_all_data()
+            results["load_all_data[snapshot]"] = measure(main.load_all_data, repeat)
+            results["save_all_data[snapshot]"] = measure(main.save_all_data, repeat)
+            results["fetch_all_records[snapshot]"] = measure(
+                main.fetch_all_records, repeat, setup=main.cache.clear)
+        finally:
+            main.STORE_FORMAT = "json"
+
+    return results
+
+
+def run(sizes, repeat=3):
+    return {str(n): bench_size(n, repeat) for n in sizes}
@@ -0,0 +1,97 @@
+# ===========================
+# MYSQL DATA LAYER BENCHMARKS
+# ===========================
+# _PY_/DB/database.py is exercised against the SQLite stand-in, so the
+# numbers track our own per-call overhead (connect, cursor, commit) rather
+# than a particular server.
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from _common import measure
+import datagen
+import db_standin
+
+
+def _seed(path, n):
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO main_records (label, type, description, datetime, severity) VALUES (?, ?, ?, ?, ?)",
+        [(r["label"], r["type"], r["description"], r["datetime"], r["severity"])
+         for r in datagen.make_main_records(n // 2)])
+    conn.executemany(
+        "INSERT INTO wellness_records (label, category, frequency, description, datetime) VALUES (?, ?, ?, ?, ?)",
+        [(r["label"], r["category"], r["frequency"], r["description"], r["datetime"])
+         for r in datagen.make_wellness_records(n - n // 2)])
+    conn.commit()
+    conn.close()
+
+
+def _last_id(path, table):
+    conn = sqlite3.connect(path)
+    (last,) = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()
+    conn.close()
+    return last
+
+
+def bench_size(n, repeat=3):
+    from DB import async_database, database
+    from query_cache import cache
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "healthhub.sqlite")
+        db_standin.create_database(path)
+        _seed(path, n)
+
+        original = database.get_connection
+        database.get_connection = db_standin.connection_factory(path)
+        try:
+            main_row = datagen.make_main_records(1, seed=99)[0]
+            wellness_row = datagen.make_wellness_records(1, seed=99)[0]
+
+            # Uncached round trips first, then the same fetches served by the query cache.
+            results["fetch_main_records"] = measure(database.fetch_main_records, repeat, setup=cache.clear)
+            results["fetch_wellness_records"] = measure(
+                database.fetch_wellness_records, repeat, setup=cache.clear)
+            results["async fetch_all_records"] = measure(
+                lambda: asyncio.run(async_database.fetch_all_records()), repeat, setup=cache.clear)
+            results["fetch_main_records[cached]"] = measure(database.fetch_main_records, repeat)
+            results["async fetch_all_records[cached]"] = measure(
+                lambda: asyncio.run(async_database.fetch_all_records()), repeat)
+
+            target = {}
+
+            def insert_then_remember(insert, row, table):
+                def setup():
+                    insert(row)
+                    target["id"] = _last_id(path, table)
+                return setup
+
+            results["insert_main_record"] = measure(
+                lambda: database.insert_main_record(main_row), repeat)
+            main_id = _last_id(path, "main_records")
+            results["update_main_record"] = measure(
+                lambda: database.update_main_record(main_id, main_row), repeat)
+            results["delete_main_record"] = measure(
+                lambda: database.delete_main_record(target["id"]), repeat,
+                setup=insert_then_remember(database.insert_main_record, main_row, "main_records"))
+
+            results["insert_wellness_record"] = measure(
+                lambda: database.insert_wellness_record(wellness_row), repeat)
+            wellness_id = _last_id(path, "wellness_records")
+            results["update_wellness_record"] = measure(
+                lambda: database.update_wellness_record(wellness_id, wellness_row), repeat)
+            results["delete_wellness_record"] = measure(
+                lambda: database.delete_wellness_record(target["id"]), repeat,
+                setup=insert_then_remember(database.insert_wellness_record, wellness_row,
+                                           "wellness_records"))
+        finally:
+            database.get_connection = original
+
+    return results
+
+
+def run(sizes, repeat=3):
+    return {str(n): bench_size(n, repeat) for n in sizes}
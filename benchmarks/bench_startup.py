@@ -0,0 +1,95 @@
+# ===========================
+# COLD STARTUP BENCHMARKS
+# ===========================
+# Every measurement runs in a fresh interpreter so nothing is cached:
+#   * `-X importtime` on `import main` (cumulative time + heavy modules seen)
+#   * time-to-first-frame: import main, build HealthHubApp, until the window
+#     gets its first <Expose> (deferred work such as the background image
+#     load runs after that and is not counted)
+# Run it on two revisions with --label before / --label after and diff the
+# results with compare.py.
+import os
+import subprocess
+import sys
+import tempfile
+
+from _common import PY_DIR, ensure_display, measure, stop_display
+import datagen
+
+HEAVY_MODULES = ("mysql", "PIL")
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+import main
+app = main.HealthHubApp()
+shown = []
+app.bind("<Expose>", lambda e: shown or shown.append(time.perf_counter()), add="+")
+while not shown:
+    app.update()
+print(shown[0] - start)
+app.destroy()
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PY_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    # Keep the whole generated history in the store so every run starts from
+    # the same files (bench_archive.py measures archiving).
+    env["HEALTHHUB_ARCHIVE_DAYS"] = "0"
+    return env
+
+
+def import_profile(cwd):
+    """Return (cumulative seconds for `import main`, heavy modules imported)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                         cwd=cwd, env=_env(), capture_output=True, text=True, check=True)
+
+    cumulative, loaded = 0.0, set()
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line.split("|")
+        name = fields[2].strip()
+        if name.split(".")[0] in HEAVY_MODULES:
+            loaded.add(name.split(".")[0])
+        if name == "main":
+            cumulative = int(fields[1]) / 1e6
+    return cumulative, sorted(loaded)
+
+
+def time_to_first_frame(cwd):
+    out = subprocess.run([sys.executable, "-c", FIRST_FRAME],
+                         cwd=cwd, env=_env(), capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def run(sizes, repeat=3):
+    """Startup cost against a store of the smallest requested size."""
+    results = {}
+    n = min(sizes)
+    with tempfile.TemporaryDirectory() as tmp:
+        datagen.write_store(tmp, n // 2, n - n // 2)
+
+        samples = []
+        results["import main"] = measure(lambda: samples.append(import_profile(tmp)), repeat)
+        results["import main"]["importtime_cumulative"] = min(s[0] for s in samples)
+        results["import main"]["heavy_modules"] = samples[-1][1]
+
+        ensure_display()
+        try:
+            frames = []
+            measure(lambda: frames.append(time_to_first_frame(tmp)), repeat)
+            frames.sort()
+            results["time_to_first_frame"] = {
+                "runs": len(frames),
+                "min": frames[0],
+                "median": frames[len(frames) // 2],
+                "mean": sum(frames) / len(frames),
+                "max": frames[-1],
+            }
+        finally:
+            stop_display()
+
+    return {str(n): results}
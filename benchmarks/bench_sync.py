@@ -0,0 +1,186 @@
+# ===========================
+# SYNC ENGINE BENCHMARKS
+# ===========================
+# Two simulated workstations share one SQLite stand-in database. Each has an
+# in-memory local store and its own sync state file. The suite times
+# push/pull for n changes and checks that both sides converge, including a
+# conflicting edit of the same record and changes queued by a window that
+# does not sync itself.
+#
+# A second case starts with data on both sides: MySQL rows from before the
+# sync columns existed (half of them also in workstation A's store), rows
+# written through DB/database.py afterwards, and local records on both
+# workstations that were never synced.
+import os
+import sqlite3
+import tempfile
+
+from _common import measure
+import datagen
+import db_standin
+
+
+class LocalStore:
+    """Minimal stand-in for main.py's records lists."""
+
+    def __init__(self):
+        self.rows = {"main": {}, "wellness": {}}
+        self.next_id = {"main": 1, "wellness": 1}
+
+    def add(self, source, data):
+        record_id = self.next_id[source]
+        self.next_id[source] += 1
+        self.rows[source][record_id] = dict(data, id=record_id)
+        return self.rows[source][record_id]
+
+    def __call__(self, source, op, record_id, data):
+        if op == "delete":
+            self.rows[source].pop(record_id, None)
+            return record_id
+        if record_id is None:
+            return self.add(source, data)["id"]
+        self.rows[source][record_id].update(data)
+        return record_id
+
+    def contents(self, source):
+        return sorted(tuple(sorted((k, v) for k, v in r.items() if k != "id"))
+                      for r in self.rows[source].values())
+
+
+def _drain(engine, store):
+    while True:
+        changes = engine.exchange()
+        engine.apply(changes, store)
+        if not changes and not engine.pending():
+            return
+
+
+def bench_size(n):
+    import sync
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "healthhub.sqlite")
+        db_standin.create_database(db_path)
+        connect = db_standin.connection_factory(db_path)
+        sync.ensure_schema(connect)
+
+        a_store, b_store = LocalStore(), LocalStore()
+        a = sync.SyncEngine(connect, os.path.join(tmp, "a.json"), dialect="sqlite", batch_size=500)
+        b = sync.SyncEngine(connect, os.path.join(tmp, "b.json"), dialect="sqlite", batch_size=500)
+
+        for row in datagen.make_main_records(n):
+            a.record_change("main", "insert", a_store.add("main", row))
+
+        # A drained outbox has nothing left to time, so each runs once.
+        results["push"] = measure(lambda: _drain(a, a_store), 1)
+        results["pull"] = measure(lambda: _drain(b, b_store), 1)
+
+        # Both sides edit record 1; the later version must win everywhere.
+        first_a = a_store.rows["main"][1]
+        first_b = next(r for r in b_store.rows["main"].values() if r["label"] == first_a["label"])
+        first_a.update(severity="Mild")
+        a.record_change("main", "update", first_a)
+        first_b.update(severity="Critical")
+        b.record_change("main", "update", first_b)
+
+        for engine, store in ((a, a_store), (b, b_store), (a, a_store)):
+            _drain(engine, store)
+
+        if a_store.contents("main") != b_store.contents("main"):
+            raise AssertionError("workstations did not converge")
+        if first_a["severity"] != "Critical":
+            raise AssertionError("the later edit did not win the conflict")
+
+        # A second window on A's store does not sync itself; it queues its
+        # changes for the window that does (main.HealthHubApp.claim_sync).
+        queue = os.path.join(tmp, "a.json.queue")
+        sync.queue_change(queue, "main", "insert",
+                          a_store.add("main", dict(datagen.make_main_records(1, seed=5)[0])))
+        sync.queue_change(queue, "main", "delete", {"id": 2})
+        a_store.rows["main"].pop(2)
+        if a.take_queued(queue) != 2 or os.path.exists(queue):
+            raise AssertionError("queued changes were not taken")
+        for engine, store in ((a, a_store), (b, b_store)):
+            _drain(engine, store)
+        if a_store.contents("main") != b_store.contents("main"):
+            raise AssertionError("queued changes did not sync")
+
+    return results
+
+
+def _clean(source, rows):
+    import schema
+
+    schema.clean_rows(source, rows)     # the app's store is always cleaned
+    return rows
+
+
+def bench_existing(n):
+    import sync
+    from DB import database
+
+    fields = sync.FIELDS["main"]
+    local = _clean("main", datagen.make_main_records(n))
+    legacy = local[: n // 2] + _clean("main", datagen.make_main_records(n // 2, seed=3))
+    direct = _clean("main", datagen.make_main_records(min(n, 100), seed=4))
+    own = _clean("wellness", datagen.make_wellness_records(n // 4))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "healthhub.sqlite")
+        db_standin.create_database(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.executemany(f"INSERT INTO main_records ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                         [tuple(r[f] for f in fields) for r in legacy])
+        conn.commit()
+        conn.close()
+
+        connect = db_standin.connection_factory(db_path)
+        sync.ensure_schema(connect)
+        original = database.get_connection
+        database.get_connection = connect
+        try:
+            for row in direct:
+                database.insert_main_record(row)
+            first_direct = len(legacy) + 1
+            database.update_main_record(first_direct, dict(direct[0], severity="Critical"))
+            database.delete_main_record(first_direct + 1)
+
+            a_store, b_store = LocalStore(), LocalStore()
+            for row in local:
+                a_store.add("main", row)
+            for row in own:
+                b_store.add("wellness", row)
+            a = sync.SyncEngine(connect, os.path.join(tmp, "a.json"), dialect="sqlite", batch_size=500)
+            b = sync.SyncEngine(connect, os.path.join(tmp, "b.json"), dialect="sqlite", batch_size=500)
+            a.seed({"main": a_store.rows["main"].values()})
+            b.seed({"wellness": b_store.rows["wellness"].values()})
+
+            results["reconcile[existing data]"] = measure(lambda: _drain(a, a_store), 1)
+            results["pull[existing data]"] = measure(lambda: _drain(b, b_store), 1)
+            _drain(a, a_store)
+
+            database.cache.clear()
+            remote = database.fetch_main_records()
+        finally:
+            database.get_connection = original
+
+        expected = len(legacy) + len(local) - n // 2 + len(direct) - 1
+        for source in ("main", "wellness"):
+            if a_store.contents(source) != b_store.contents(source):
+                raise AssertionError(f"workstations did not converge ({source})")
+        if len(a_store.rows["main"]) != expected or len(remote) != expected:
+            raise AssertionError("existing records were lost or copied twice")
+        if len(a_store.rows["wellness"]) != len(own):
+            raise AssertionError("local records were not pushed")
+        edited = [r for r in a_store.rows["main"].values()
+                  if r["description"] == direct[0]["description"] and r["datetime"] == direct[0]["datetime"]]
+        if [r["severity"] for r in edited] != ["Critical"]:
+            raise AssertionError("an update made through DB/database.py did not sync")
+
+    return results
+
+
+def run(sizes, repeat=1):
+    return {str(n): dict(bench_size(n), **bench_existing(n)) for n in sizes}
@@ -0,0 +1,73 @@
+# ===========================
+# DASHBOARD REFRESH BENCHMARKS
+# ===========================
+# Runs against a real Tk root. Without a display an Xvfb server is started,
+# or run the whole suite under `xvfb-run -a`.
+import os
+import tempfile
+
+from _common import ensure_display, measure, stop_display
+import datagen
+from bench_data_layer import _point_at
+
+LONG_DESCRIPTION_WORDS = (400, 800)
+
+
+def bench_size(n, repeat=3):
+    import tkinter as tk
+    import main
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        datagen.write_store(tmp, n // 2, n - n // 2)
+        _point_at(main, tmp)
+        main.load_all_data()
+
+        root = tk.Tk()
+        root.withdraw()
+        main.setup_styles(root)
+        try:
+            holder = {}
+
+            def build():
+                if "dash" in holder:
+                    holder["dash"].destroy()
+                holder["dash"] = main.Dashboard(root)
+                holder["dash"].pack(fill="both", expand=True)
+                root.update_idletasks()
+
+            results["Dashboard.__init__"] = measure(build, repeat)
+            dash = holder["dash"]
+
+            def refresh(fn):
+                def run():
+                    fn()
+                    root.update_idletasks()
+                return run
+
+            results["Dashboard.load_records"] = measure(refresh(dash.load_records), repeat)
+            results["Dashboard.load_records(wellness_only)"] = measure(
+                refresh(lambda: dash.load_records(True)), repeat)
+            results["Dashboard.filter_main_type"] = measure(
+                refresh(lambda: dash.filter_main_type("Symptoms")), repeat)
+
+            # Same rows with descriptions ~50x longer: the table only shows
+            # a preview, so this should cost about the same.
+            long_dir = os.path.join(tmp, "long")
+            datagen.write_store(long_dir, n // 2, n - n // 2, words=LONG_DESCRIPTION_WORDS)
+            _point_at(main, long_dir)
+            main.load_all_data()
+            results["Dashboard.load_records[long descriptions]"] = measure(
+                refresh(dash.load_records), repeat, setup=main.cache.clear)
+        finally:
+            root.destroy()
+
+    return results
+
+
+def run(sizes, repeat=3):
+    ensure_display()
+    try:
+        return {str(n): bench_size(n, repeat) for n in sizes}
+    finally:
+        stop_display()
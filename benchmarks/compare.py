@@ -0,0 +1,49 @@
+# ===========================
+# COMPARE TWO BENCHMARK RUNS
+# ===========================
+# Usage: python benchmarks/compare.py results/old.json results/new.json
+# Prints the median ratio (new / old) for every benchmark both runs share
+# and exits non-zero when any ratio exceeds --threshold.
+import argparse
+import json
+import sys
+
+
+def _flatten(payload):
+    flat = {}
+    for suite, sizes in payload["results"].items():
+        for size, benches in sizes.items():
+            for name, stats in benches.items():
+                flat[(suite, size, name)] = stats["median"]
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two HealthHub benchmark runs")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio above which a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    before, after = _flatten(old), _flatten(new)
+    regressions = 0
+
+    print(f"{'benchmark':60} {old['label']:>12} {new['label']:>12} {'ratio':>8}")
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key] / before[key] if before[key] else float("inf")
+        flag = "  <-- slower" if ratio > args.threshold else ""
+        regressions += bool(flag)
+        name = "/".join(key)
+        print(f"{name:60} {before[key]:12.6f} {after[key]:12.6f} {ratio:8.2f}{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# ===========================
+# SYNTHETIC DATA GENERATORS
+# ===========================
+# Records are shaped like Json/healthhub_records.json and
+# Json/healthhub_wellness.json, including the stray "\n" the forms leave
+# behind, so the benchmarks see realistic strings.
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+MAIN_TYPES = ["Symptoms", "Medicine", "Appointment"]
+SEVERITIES = ["Mild", "Moderate", "Critical"]
+CATEGORIES = ["Exercise", "Nutrition", "Sleep", "Self-Care", "Mental Wellness", "Hygiene"]
+FREQUENCIES = ["Daily", "Weekly", "Routine", "Sometimes"]
+
+LABELS = {
+    "Symptoms": ["Fever and Cough", "Headache", "Back Pain", "Sore Throat", "Dizziness"],
+    "Medicine": ["Paracetamol", "Ibuprofen", "Vitamin C", "Antihistamine", "Cough Syrup"],
+    "Appointment": ["Dr. Smith Follow-up", "Dental Check", "Blood Test", "Eye Exam"],
+}
+WELLNESS_LABELS = ["Morning Jog", "Healthy Breakfast", "Meditation", "Early Sleep", "Stretching"]
+WORDS = ("high temperature persistent cough fatigue drink water rest discuss recent "
+         "blood test results medication adjustments light jog improve stamina "
+         "balanced breakfast protein fruits whole grains").split()
+
+START = datetime(2020, 1, 1, 6, 0)
+
+
+DESCRIPTION_WORDS = (3, 20)
+
+
+def _description(rng, words=DESCRIPTION_WORDS):
+    words = rng.choices(WORDS, k=rng.randint(*words))
+    return " ".join(words).capitalize() + "."
+
+
+def _datetime(rng):
+    moment = START + timedelta(minutes=rng.randrange(0, 6 * 365 * 24 * 60, 30))
+    return moment.strftime("%Y-%m-%d %I:%M %p")
+
+
+def make_main_records(n, seed=1, words=DESCRIPTION_WORDS):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, n + 1):
+        typ = rng.choice(MAIN_TYPES)
+        label = rng.choice(LABELS[typ])
+        if rng.random() < 0.5:
+            label += "\n"
+        rows.append({
+            "label": label,
+            "type": typ,
+            "description": _description(rng, words),
+            "datetime": _datetime(rng),
+            "severity": rng.choice(SEVERITIES),
+            "id": i,
+        })
+    return rows
+
+
+def make_wellness_records(n, seed=2, words=DESCRIPTION_WORDS):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, n + 1):
+        rows.append({
+            "label": rng.choice(WELLNESS_LABELS) + "\n",
+            "category": rng.choice(CATEGORIES),
+            "frequency": rng.choice(FREQUENCIES),
+            "description": _description(rng, words),
+            "datetime": _datetime(rng) + "\n",
+            "id": i,
+        })
+    return rows
+
+
+def write_store(directory, n_main, n_wellness=None, words=DESCRIPTION_WORDS):
+    """Write both JSON files into `directory` and return their paths."""
+    if n_wellness is None:
+        n_wellness = n_main
+
+    os.makedirs(directory, exist_ok=True)
+    main_file = os.path.join(directory, "healthhub_records.json")
+    wellness_file = os.path.join(directory, "healthhub_wellness.json")
+
+    with open(main_file, "w") as f:
+        json.dump(make_main_records(n_main, words=words), f, indent=4)
+    with open(wellness_file, "w") as f:
+        json.dump(make_wellness_records(n_wellness, words=words), f, indent=4)
+
+    return main_file, wellness_file
@@ -0,0 +1,90 @@
+# ===========================
+# LOCAL MYSQL STAND-IN
+# ===========================
+# A tiny SQLite wrapper that speaks enough of the mysql.connector API
+# (`%s` placeholders, cursor(dictionary=True), commit/close) for the
+# functions in _PY_/DB/database.py to run unchanged. SQLite locks the whole
+# database for a write, so `FOR UPDATE` row locks are dropped.
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS main_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT, type TEXT, description TEXT, datetime TEXT, severity TEXT
+);
+CREATE TABLE IF NOT EXISTS wellness_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT, category TEXT, frequency TEXT, description TEXT, datetime TEXT
+);
+"""
+
+
+def _sqlite(query):
+    return query.replace("%s", "?").replace(" FOR UPDATE", "")
+
+
+class StandInCursor:
+    def __init__(self, cursor, dictionary=False):
+        self._cur = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=()):
+        self._cur.execute(_sqlite(query), params)
+
+    def executemany(self, query, seq):
+        self._cur.executemany(_sqlite(query), seq)
+
+    def fetchall(self):
+        rows = self._cur.fetchall()
+        if self._dictionary:
+            return [dict(r) for r in rows]
+        return [tuple(r) for r in rows]
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is None:
+            return None
+        return dict(row) if self._dictionary else tuple(row)
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    def close(self):
+        self._cur.close()
+
+
+class StandInConnection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+
+    def cursor(self, dictionary=False):
+        return StandInCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def create_database(path, schema=SCHEMA):
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.commit()
+    conn.close()
+
+
+def connection_factory(path):
+    """Return a get_connection() replacement bound to the SQLite file."""
+    def get_connection():
+        return StandInConnection(path)
+    return get_connection
@@ -0,0 +1,51 @@
+# ===========================
+# BENCHMARK RUNNER
+# ===========================
+# Usage:
+#   python benchmarks/run.py                       # every suite at 1k/100k/1M
+#   python benchmarks/run.py --suite data --sizes 1k,100k
+#   python benchmarks/run.py --label v1.2 --output results.json
+#
+# Results are written as JSON (benchmarks/results/<label>.json by default)
+# and can be diffed with benchmarks/compare.py.
+import argparse
+import importlib
+
+from _common import DEFAULT_SIZES, parse_sizes, write_results
+
+SUITES = {
+    "data": "bench_data_layer",
+    "ui": "bench_ui",
+    "db": "bench_database",
+    "startup": "bench_startup",
+    "sync": "bench_sync",
+    "backup": "bench_backup",
+    "archive": "bench_archive",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HealthHub benchmark suite")
+    parser.add_argument("--suite", choices=sorted(SUITES) + ["all"], default="all")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma separated row counts, e.g. 1k,100k,1M")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label", help="name for this run (defaults to the git revision)")
+    parser.add_argument("--output", help="results file (defaults to benchmarks/results/<label>.json)")
+    args = parser.parse_args()
+
+    sizes = parse_sizes(args.sizes)
+    names = sorted(SUITES) if args.suite == "all" else [args.suite]
+
+    results = {}
+    for name in names:
+        print(f"Running {name} suite at sizes {sizes} ...")
+        module = importlib.import_module(SUITES[name])
+        results[name] = module.run(sizes, args.repeat)
+
+    path = write_results(results, args.output, args.label)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# ===============================
+# MULTI-PROCESS STORE STRESS TEST
+# ===============================
+# Usage:
+#   python benchmarks/stress_concurrency.py
+#   python benchmarks/stress_concurrency.py --processes 16 --ops 300 --format snapshot
+#
+# Starts several processes that share one store directory and run random
+# inserts, updates (with the optimistic version check) and deletes through
+# main.py's data-layer functions. Afterwards the store is checked:
+#   * no id was handed out twice, and deleted ids are gone
+#   * every surviving record's version is 1 + the updates that succeeded
+#   * the files parse and match what the workers report
+# Exits with status 1 if a check fails.
+import argparse
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import _common  # noqa: F401  (puts _PY_ on sys.path)
+import datagen
+from bench_data_layer import _point_at
+
+
+def worker(directory, store_format, worker_no, ops, results):
+    import locking
+    import main
+
+    _point_at(main, directory)
+    main.STORE_FORMAT = store_format
+    main.load_all_data()
+
+    rng = random.Random(worker_no)
+    template = datagen.make_main_records(1, seed=worker_no)[0]
+    inserted, deleted, mine = [], [], []
+    updates, conflicts = Counter(), 0
+
+    for op in range(ops):
+        choice = rng.random()
+        if choice < 0.4 or not mine:
+            record_id = main.insert_record(dict(template, label=f"worker {worker_no} #{op}"))
+            inserted.append(record_id)
+            mine.append(record_id)
+
+        elif choice < 0.85:
+            # Like a form: read the record, then save it with the version it showed.
+            with main.store_lock():
+                main.refresh_from_disk()
+                if not main.records:
+                    continue
+                rec = main.records[rng.randrange(len(main.records))]
+                record_id, version = rec["id"], rec.get("version", 0)
+            try:
+                main.update_record(record_id, {"description": f"edited by {worker_no}", "version": version})
+                updates[record_id] += 1
+            except locking.VersionConflict:
+                conflicts += 1
+
+        else:
+            record_id = mine.pop(rng.randrange(len(mine)))
+            main.delete_record_db(record_id)
+            deleted.append(record_id)
+
+    results.put({"inserted": inserted, "deleted": deleted,
+                 "updates": dict(updates), "conflicts": conflicts})
+
+
+def check(directory, store_format, reports):
+    import main
+
+    _point_at(main, directory)
+    main.STORE_FORMAT = store_format
+    main.records, main.next_id = [], 1
+    main.load_all_data()
+    stored = {r["id"]: r for r in main.records}
+
+    errors = []
+    inserted = [i for rep in reports for i in rep["inserted"]]
+    deleted = {i for rep in reports for i in rep["deleted"]}
+    duplicates = [i for i, n in Counter(inserted).items() if n > 1]
+    if duplicates:
+        errors.append(f"ids handed out twice: {sorted(duplicates)[:10]}")
+    if len(stored) != len(main.records):
+        errors.append("duplicate ids in the store")
+
+    expected = set(inserted) - deleted
+    if set(stored) != expected:
+        errors.append(f"{len(set(stored) ^ expected)} records missing or not deleted")
+
+    updates = Counter()
+    for rep in reports:
+        updates.update({int(k): v for k, v in rep["updates"].items()})
+    for record_id in expected & set(stored):
+        version = stored[record_id].get("version", 0)
+        if version != 1 + updates[record_id]:
+            errors.append(f"record {record_id}: version {version}, expected {1 + updates[record_id]}")
+            break
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HealthHub multi-process stress test")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="operations per process")
+    parser.add_argument("--format", choices=("json", "snapshot"), default="json")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(tmp, args.format, n, args.ops, results))
+                 for n in range(args.processes)]
+
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        reports = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        total = args.processes * args.ops
+        conflicts = sum(rep["conflicts"] for rep in reports)
+        print(f"{args.processes} processes x {args.ops} ops ({args.format}): "
+              f"{total / elapsed:.0f} ops/s, {conflicts} update conflicts detected")
+
+        errors = check(tmp, args.format, reports)
+    for error in errors:
+        print("FAIL:", error)
+    if errors or any(p.exitcode for p in procs):
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()